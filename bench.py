@@ -0,0 +1,618 @@
+import argparse
+import hashlib
+import inspect
+import json
+import os
+import random
+import resource
+import statistics
+import struct
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# ---------------------------
+# Offline benchmark harness
+# ---------------------------
+# python bench.py --runs 3
+# python bench.py --gui --runs 2 --llm-latency 0.5 --llm-rate 80 --json bench.json
+# python bench.py --startup --runs 5 --offscreen
+#
+# Drives ResearchEngine (or the full terminal with --gui) against local stand-ins:
+# a fake Ollama chat server, a stub search backend and an HTTP server serving a
+# generated (or --corpus) set of pages and images. Nothing touches the network.
+# --startup instead measures terminal cold start in fresh interpreters: an
+# import-time breakdown (python -X importtime) and time to first paint.
+
+WORDS = (
+    "market revenue growth share customers platform pricing margin competitors regulation "
+    "demand supply cloud enterprise consumer subscription retention churn expansion forecast "
+    "investment capital strategy partnership acquisition brand innovation patent scale cost "
+    "quarter annual billion million percent region europe asia america segment product service"
+).split()
+
+
+def words(rng, n):
+    return " ".join(rng.choice(WORDS) for _ in range(n))
+
+
+def make_png(width, height, rgb):
+    """Minimal solid-colour PNG, so fixtures need no imaging library."""
+    raw = b''.join(b'\x00' + bytes(rgb) * width for _ in range(height))
+
+    def chunk(tag, data):
+        return struct.pack('>I', len(data)) + tag + data + struct.pack('>I', zlib.crc32(tag + data) & 0xffffffff)
+
+    return (b'\x89PNG\r\n\x1a\n'
+            + chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0))
+            + chunk(b'IDAT', zlib.compress(raw))
+            + chunk(b'IEND', b''))
+
+
+# -----------------
+# Fixture web server
+# -----------------
+class Corpus:
+    """path -> (content type, body). Generated deterministically unless a directory is given."""
+
+    def __init__(self, pages=60, seed=7, directory=None):
+        self.files = {}
+        self.page_paths = []
+        if directory:
+            self._load(directory)
+        else:
+            self._generate(pages, random.Random(seed))
+
+    def _load(self, directory):
+        for name in sorted(os.listdir(directory)):
+            path = os.path.join(directory, name)
+            if not os.path.isfile(path):
+                continue
+            with open(path, 'rb') as f:
+                body = f.read()
+            url = f"/page/{name}"
+            if name.endswith(('.html', '.htm')):
+                self.files[url] = ('text/html; charset=utf-8', body)
+                self.page_paths.append(url)
+            elif name.endswith('.png'):
+                self.files[url] = ('image/png', body)
+
+    def _generate(self, pages, rng):
+        self.files['/logo.png'] = ('image/png', make_png(32, 32, (255, 170, 0)))
+        self.files['/report.pdf'] = ('application/pdf', b'%PDF-1.4\n' + os.urandom(64 * 1024))
+        for i in range(pages):
+            imgs = []
+            for j in range(2):
+                path = f"/img/{i}-{j}.png"
+                self.files[path] = ('image/png', make_png(640, 400, (rng.randrange(256), rng.randrange(256), rng.randrange(256))))
+                imgs.append(f'<img src="{path}" width="640" height="400">')
+            paragraphs = "".join(f"<p>{words(rng, rng.randint(60, 140))}.</p>" for _ in range(rng.randint(6, 14)))
+            # Realistic boilerplate around the article: scripts, navigation, footer
+            script = "<script>" + "var t=" + json.dumps(words(rng, 400)) + ";" + "</script>"
+            html = (
+                f"<html><head><title>Fixture {i}</title>{script}<style>.x{{color:red}}</style></head><body>"
+                f"<nav><a href='/'>Home</a> <a href='/about'>About</a> <img src='/logo.png'></nav>"
+                f"<main><article><h1>{words(rng, 6)}</h1>{paragraphs}{''.join(imgs)}</article></main>"
+                f"<footer>{words(rng, 30)}</footer></body></html>"
+            )
+            path = f"/page/{i}.html"
+            self.files[path] = ('text/html; charset=utf-8', html.encode('utf-8'))
+            self.page_paths.append(path)
+        self.page_paths.append('/report.pdf')
+
+
+class FixtureServer:
+    def __init__(self, corpus, latency=0.05):
+        self.corpus = corpus
+        self.latency = latency
+        self.requests = 0
+        self.bytes_sent = 0
+        self._lock = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                time.sleep(server.latency)
+                entry = server.corpus.files.get(self.path.split('?')[0])
+                if entry is None:
+                    self.send_error(404)
+                    return
+                content_type, body = entry
+                etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+                with server._lock:
+                    server.requests += 1
+                if self.headers.get('If-None-Match') == etag:
+                    self.send_response(304)
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                self.send_header('ETag', etag)
+                self.end_headers()
+                try:
+                    self.wfile.write(body)
+                    with server._lock:
+                        server.bytes_sent += len(body)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass  # client stopped reading at its byte cap
+
+        self.httpd = _serve(Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_port}"
+
+
+class StubSearch:
+    """Deterministic search backend over the fixture pages; queries overlap like real ones do."""
+
+    def __init__(self, base_url, corpus, latency=0.1):
+        self.base_url = base_url
+        self.paths = corpus.page_paths
+        self.latency = latency
+        self.calls = 0
+
+    def __call__(self, q, max_results):
+        time.sleep(self.latency)
+        self.calls += 1
+        rng = random.Random(hashlib.sha1(q.lower().encode('utf-8')).digest())
+        picks = rng.sample(self.paths, min(max_results, len(self.paths)))
+        return [{'title': p, 'href': self.base_url + p, 'body': ''} for p in picks]
+
+
+# -----------------
+# Fake Ollama chat server
+# -----------------
+class FakeChatServer:
+    """Implements POST /api/chat (streaming and not) with a configurable latency and token rate."""
+
+    def __init__(self, latency=0.3, rate=200.0, reply_words=250, max_concurrency=None):
+        self.latency = latency
+        self.rate = rate
+        self.reply_words = reply_words
+        self.max_concurrency = max_concurrency  # beyond this many requests in flight, answer 429
+        self.in_flight = 0
+        self.rejected = 0
+        self.aborted = 0  # client hung up mid-reply (cancelled runs)
+        self.requests = 0
+        self.prompt_tokens = 0
+        self.output_tokens = 0
+        self._lock = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+                with server._lock:
+                    limited = server.max_concurrency is not None and server.in_flight >= server.max_concurrency
+                    if limited:
+                        server.rejected += 1
+                    else:
+                        server.in_flight += 1
+                if limited:
+                    self.send_error(429, "Too Many Requests")
+                    return
+                try:
+                    self.respond(body)
+                except (BrokenPipeError, ConnectionResetError):
+                    with server._lock:
+                        server.aborted += 1
+                finally:
+                    with server._lock:
+                        server.in_flight -= 1
+
+            def respond(self, body):
+                prompt = body['messages'][-1]['content']
+                reply = server.reply(prompt)
+                tokens = reply.split(' ')
+                with server._lock:
+                    server.requests += 1
+                    server.prompt_tokens += len(prompt) // 4
+                    server.output_tokens += len(tokens)
+                base = {'model': body.get('model', ''), 'created_at': '2026-01-01T00:00:00Z'}
+                time.sleep(server.latency)
+                if body.get('stream', True):
+                    self.send_response(200)
+                    self.send_header('Content-Type', 'application/x-ndjson')
+                    self.end_headers()
+                    for i in range(0, len(tokens), 4):
+                        piece = " ".join(tokens[i:i + 4]) + " "
+                        time.sleep(4 / server.rate)
+                        line = dict(base, message={'role': 'assistant', 'content': piece}, done=False)
+                        self.wfile.write(json.dumps(line).encode('utf-8') + b'\n')
+                        self.wfile.flush()
+                    last = dict(base, message={'role': 'assistant', 'content': ''}, done=True,
+                                prompt_eval_count=len(prompt) // 4, eval_count=len(tokens))
+                    self.wfile.write(json.dumps(last).encode('utf-8') + b'\n')
+                else:
+                    time.sleep(len(tokens) / server.rate)
+                    data = json.dumps(dict(base, message={'role': 'assistant', 'content': reply}, done=True,
+                                           prompt_eval_count=len(prompt) // 4, eval_count=len(tokens))).encode('utf-8')
+                    self.send_response(200)
+                    self.send_header('Content-Type', 'application/json')
+                    self.send_header('Content-Length', str(len(data)))
+                    self.end_headers()
+                    self.wfile.write(data)
+
+        self.httpd = _serve(Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_port}"
+
+    def reply(self, prompt):
+        rng = random.Random(hashlib.sha1(prompt.encode('utf-8')).digest())
+        if "Python list" in prompt:
+            return str([f"{words(rng, 3)} analysis {i}" for i in range(7)])
+        if "STRICT JSON" in prompt:
+            return json.dumps({
+                'market_variation': {'labels': [str(y) for y in range(2020, 2026)],
+                                     'values': [round(rng.uniform(5, 50), 1) for _ in range(6)]},
+                'pestle': {k: rng.randint(1, 10) for k in
+                           ('political', 'environmental', 'social', 'technological', 'legal', 'economic')},
+                'moat': {k: rng.randint(10, 95) for k in ('brand', 'network effects', 'switching costs', 'scale')},
+            })
+        if "flow diagram or infographics" in prompt:
+            steps = "".join(f"<div class='step'>{words(rng, 8)}</div>" for _ in range(6))
+            return f"<html><head><style>.step{{padding:8px;border:1px solid #ffaa00}}</style></head><body>{steps}</body></html>"
+        bullets = "\n".join(f"- **{words(rng, 2)}**: {words(rng, 14)}" for _ in range(5))
+        body = words(rng, max(0, self.reply_words - 80))
+        return f"### {words(rng, 4)}\n\n{body}.\n\n{bullets}\n"
+
+
+def _serve(handler):
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    httpd.daemon_threads = True
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    return httpd
+
+
+# -----------------
+# Measurement
+# -----------------
+class RssSampler:
+    """Peak resident memory of this process during a run (Linux /proc, else ru_maxrss)."""
+
+    def __init__(self, interval=0.05):
+        self.interval = interval
+        self.peak_kb = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+
+    def _current_kb(self):
+        try:
+            with open('/proc/self/status') as f:
+                for line in f:
+                    if line.startswith('VmRSS:'):
+                        return int(line.split()[1])
+        except OSError:
+            pass
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    def _loop(self):
+        while not self._stop.is_set():
+            self.peak_kb = max(self.peak_kb, self._current_kb())
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak_kb = max(self.peak_kb, self._current_kb())
+
+
+class EventClock:
+    """Timestamps the engine events that mark phase boundaries."""
+
+    def __init__(self):
+        self.t0 = time.perf_counter()
+        self.first_query = None
+        self.mining_done = None
+        self.finished = None
+        self.errors = []
+
+    def __call__(self, kind, *args):
+        now = time.perf_counter()
+        if kind == 'query' and self.first_query is None:
+            self.first_query = now
+        elif kind == 'progress' and args[0] >= 50 and self.mining_done is None:
+            self.mining_done = now
+        elif kind == 'finished':
+            self.finished = now
+        elif kind == 'log' and args[0] == 'ERROR':
+            self.errors.append(args[1])
+
+    def phases(self):
+        end = self.finished or time.perf_counter()
+        first_query = self.first_query or end
+        mining_done = self.mining_done or end
+        return {
+            'phase.vectors_s': first_query - self.t0,
+            'phase.mining_s': mining_done - first_query,
+            'phase.report_s': end - mining_done,
+            'phase.total_s': end - self.t0,
+        }
+
+
+def counters(chat, web, search):
+    return (chat.requests, chat.output_tokens, chat.rejected, web.requests, web.bytes_sent, search.calls)
+
+
+def run_metrics(clock, before, after, rss):
+    phases = clock.phases()
+    total = max(phases['phase.total_s'], 1e-9)
+    llm_requests, llm_tokens, rejected, pages, page_bytes, searches = (a - b for a, b in zip(after, before))
+    return dict(phases, **{
+        'llm.requests': llm_requests,
+        'llm.rejected_429': rejected,
+        'llm.tokens_per_s': llm_tokens / total,
+        'web.requests': pages,
+        'web.mb': page_bytes / 1e6,
+        'search.calls': searches,
+        'mem.peak_rss_mb': rss.peak_kb / 1024,
+    })
+
+
+def run_headless(target, options, servers):
+    from engine import ResearchEngine
+
+    chat, web, search = servers
+    clock = EventClock()
+    before = counters(chat, web, search)
+    with RssSampler() as rss:
+        engine = ResearchEngine(target, on_event=clock, **options)
+        engine.run()
+    metrics = run_metrics(clock, before, counters(chat, web, search), rss)
+    return metrics, clock.errors
+
+
+class Heartbeat:
+    """Measures how long the GUI event loop fails to service a fast timer."""
+
+    def __init__(self, interval_ms=10, threshold_ms=30):
+        from PyQt5.QtCore import QTimer
+
+        self.interval_ms = interval_ms
+        self.threshold_ms = threshold_ms
+        self.blocked_ms = 0.0
+        self.max_stall_ms = 0.0
+        self.last = None
+        self.timer = QTimer()
+        self.timer.setInterval(interval_ms)
+        self.timer.timeout.connect(self.tick)
+
+    def tick(self):
+        now = time.perf_counter()
+        if self.last is not None:
+            late = (now - self.last) * 1000 - self.interval_ms
+            if late > self.threshold_ms:
+                self.blocked_ms += late
+            self.max_stall_ms = max(self.max_stall_ms, late)
+        self.last = now
+
+
+def run_gui(target, options, servers):
+    from PyQt5.QtCore import QEventLoop, QTimer
+    from pegasus import PegasusTerminal
+
+    chat, web, search = servers
+    terminal = PegasusTerminal()
+    terminal.agent_options = options
+    terminal.show()
+    beat = Heartbeat()
+    loop = QEventLoop()
+    clock = EventClock()
+    before = counters(chat, web, search)
+    with RssSampler() as rss:
+        beat.timer.start()
+        worker = terminal.submit(target).worker
+        worker.query_sig.connect(lambda run, q: clock('query', q))
+        worker.progress_sig.connect(lambda run, v: clock('progress', v))
+        worker.log_sig.connect(lambda run, tag, msg: clock('log', tag, msg))
+        worker.finished_sig.connect(lambda run: clock('finished'))
+        worker.finished.connect(loop.quit)
+        loop.exec_()
+        # Let queued signals and image thumbnails land before stopping the clock
+        QTimer.singleShot(500, loop.quit)
+        loop.exec_()
+        beat.timer.stop()
+    metrics = run_metrics(clock, before, counters(chat, web, search), rss)
+    metrics['gui.blocked_ms'] = beat.blocked_ms
+    metrics['gui.max_stall_ms'] = beat.max_stall_ms
+    terminal.close()
+    terminal.deleteLater()
+    return metrics, clock.errors
+
+
+# ---------------------------
+# Cold start
+# ---------------------------
+def startup_probe(launched):
+    """Runs in a fresh interpreter: build the terminal and time it up to the first idle loop after painting.
+
+    run_startup() sends over this function's source alone, so the interpreter
+    loads nothing beyond what the terminal itself imports.
+    """
+    started = time.time()
+    from PyQt5.QtCore import QCoreApplication, QEvent, QObject, Qt, QTimer
+    from PyQt5.QtWidgets import QApplication
+
+    QCoreApplication.setAttribute(Qt.AA_ShareOpenGLContexts)
+    app = QApplication(sys.argv[:1])
+    qt_ready = time.time()
+    import pegasus
+    imported = time.time()
+    terminal = pegasus.PegasusTerminal()
+    built = time.time()
+    marks = {}
+
+    def interactive():
+        marks['interactive'] = time.time()
+        app.quit()
+
+    class FirstPaint(QObject):
+        def eventFilter(self, obj, event):
+            if event.type() == QEvent.Paint and 'paint' not in marks:
+                marks['paint'] = time.time()
+                QTimer.singleShot(0, interactive)
+            return False
+
+    watcher = FirstPaint()
+    terminal.installEventFilter(watcher)
+    terminal.show()
+    QTimer.singleShot(30000, app.quit)
+    app.exec_()
+    print(json.dumps({
+        'startup.interpreter_s': started - launched,
+        'startup.qt_init_s': qt_ready - started,
+        'startup.import_s': imported - qt_ready,
+        'startup.window_s': built - imported,
+        'startup.first_paint_s': marks.get('paint', float('nan')) - launched,
+        'startup.interactive_s': marks.get('interactive', float('nan')) - launched,
+    }))
+
+
+def import_breakdown(importtime_log):
+    """Self import time in ms per top-level package, from python -X importtime output."""
+    totals = {}
+    for line in importtime_log.splitlines():
+        if not line.startswith('import time:') or 'imported package' in line:
+            continue
+        self_us, _, name = line[len('import time:'):].split('|')
+        root = name.strip().split('.')[0]
+        totals[root] = totals.get(root, 0.0) + int(self_us) / 1000
+    return totals
+
+
+def run_startup():
+    # Not bench.py itself: its HTTP stand-ins would show up in the import breakdown
+    source = inspect.getsource(startup_probe)
+    launched = time.time()
+    probe = f"import json, sys, time\n{source}\nstartup_probe({launched!r})\n"
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', probe],
+        capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__))
+    )
+    lines = proc.stdout.strip().splitlines()
+    if proc.returncode or not lines:
+        raise RuntimeError(f"startup probe failed:\n{proc.stderr[-2000:]}")
+    metrics = json.loads(lines[-1])
+    for root, ms in import_breakdown(proc.stderr).items():
+        metrics[f"import.{root}_ms"] = ms
+    return metrics
+
+
+def print_startup(runs, top=15):
+    timings = [row for row in summarize(runs) if row[0].startswith('startup.')]
+    imports = sorted((row for row in summarize(runs) if row[0].startswith('import.')), key=lambda r: -r[1])
+    print(f"\nPegasus cold start: {len(runs)} runs")
+    print(f"{'metric':<26}{'mean':>10}{'min':>10}{'max':>10}")
+    for name, mean, lo, hi in timings:
+        print(f"{name:<26}{mean:>10.3f}{lo:>10.3f}{hi:>10.3f}")
+    print(f"\nSlowest imports (self time, ms, top {top} of {len(imports)} packages)")
+    for name, mean, lo, hi in imports[:top]:
+        print(f"{name[len('import.'):-len('_ms')]:<26}{mean:>10.1f}{lo:>10.1f}{hi:>10.1f}")
+
+
+def clear_caches():
+    import shutil
+    from cache import data_dir, get_cache
+
+    get_cache().clear()
+    get_cache('llm').clear()
+    shutil.rmtree(os.path.join(data_dir(), 'thumbs'), ignore_errors=True)
+
+
+def summarize(runs):
+    keys = sorted({k for r in runs for k in r})
+    rows = []
+    for k in keys:
+        values = [r[k] for r in runs if k in r]
+        rows.append((k, statistics.mean(values), min(values), max(values)))
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Offline Pegasus benchmark against local stand-ins.")
+    parser.add_argument('--runs', type=int, default=3)
+    parser.add_argument('--target', default="Acme Robotics")
+    parser.add_argument('--gui', action='store_true', help="drive the full terminal and measure GUI-thread blocking")
+    parser.add_argument('--offscreen', action='store_true', help="use Qt's offscreen platform (no display needed)")
+    parser.add_argument('--cache', choices=('cold', 'warm'), default='cold', help="clear caches before each run or not")
+    parser.add_argument('--corpus', help="directory of .html/.png fixtures instead of the generated corpus")
+    parser.add_argument('--pages', type=int, default=60, help="generated fixture pages")
+    parser.add_argument('--llm-latency', type=float, default=0.3, help="seconds before the first token")
+    parser.add_argument('--llm-rate', type=float, default=200.0, help="generated tokens per second")
+    parser.add_argument('--reply-words', type=int, default=250)
+    parser.add_argument('--llm-max-concurrency', type=int, default=None,
+                        help="fake provider answers 429 beyond this many requests in flight")
+    parser.add_argument('--page-latency', type=float, default=0.05)
+    parser.add_argument('--search-latency', type=float, default=0.1)
+    parser.add_argument('--home', help="PEGASUS_HOME for caches (default: a temporary directory)")
+    parser.add_argument('--json', help="write every run's metrics to this file")
+    parser.add_argument('--startup', action='store_true', help="measure terminal cold start instead of runs")
+    args = parser.parse_args(argv)
+
+    # Keep benchmark caches away from the user's real ones
+    os.environ['PEGASUS_HOME'] = args.home or tempfile.mkdtemp(prefix='pegasus-bench-')
+    if args.offscreen:
+        os.environ['QT_QPA_PLATFORM'] = 'offscreen'
+
+    if args.startup:
+        runs = []
+        for i in range(args.runs):
+            runs.append(run_startup())
+            print(f"run {i + 1}/{args.runs}: first paint {runs[-1]['startup.first_paint_s']:.2f}s", file=sys.stderr)
+        print_startup(runs)
+        if args.json:
+            with open(args.json, 'w', encoding='utf-8') as f:
+                json.dump({'args': vars(args), 'runs': runs}, f, indent=2)
+        return 0
+
+    corpus = Corpus(pages=args.pages, directory=args.corpus)
+    web = FixtureServer(corpus, latency=args.page_latency)
+    chat = FakeChatServer(latency=args.llm_latency, rate=args.llm_rate, reply_words=args.reply_words,
+                          max_concurrency=args.llm_max_concurrency)
+    search = StubSearch(web.url, corpus, latency=args.search_latency)
+    options = {'llm_host': chat.url, 'search_backend': search}
+
+    app = None
+    if args.gui:
+        from PyQt5.QtCore import QCoreApplication, Qt
+        from PyQt5.QtWidgets import QApplication
+        # The terminal imports QtWebEngine lazily, after the application exists
+        QCoreApplication.setAttribute(Qt.AA_ShareOpenGLContexts)
+        app = QApplication.instance() or QApplication(sys.argv)
+
+    runs = []
+    for i in range(args.runs):
+        if args.cache == 'cold':
+            clear_caches()
+        runner = run_gui if args.gui else run_headless
+        metrics, errors = runner(args.target, options, (chat, web, search))
+        runs.append(metrics)
+        status = "ok" if not errors else f"errors: {errors}"
+        print(f"run {i + 1}/{args.runs}: {metrics['phase.total_s']:.2f}s ({status})", file=sys.stderr)
+
+    mode = "gui" if args.gui else "headless"
+    print(f"\nPegasus benchmark: {args.runs} runs, {mode}, cache {args.cache}, target {args.target!r}")
+    print(f"{'metric':<22}{'mean':>12}{'min':>12}{'max':>12}")
+    for name, mean, lo, hi in summarize(runs):
+        print(f"{name:<22}{mean:>12.2f}{lo:>12.2f}{hi:>12.2f}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'args': {k: v for k, v in vars(args).items()}, 'runs': runs}, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,212 @@
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from dataclasses import dataclass, field
+
+# ---------------------------
+# Persistent content-addressed cache
+# ---------------------------
+# Entries map (namespace, key) -> blob hash; blobs are zlib-compressed and stored
+# once per distinct content, so syndicated pages served from several URLs share
+# storage. Size is bounded by LRU eviction over entries.
+
+
+def data_dir():
+    """Directory for Pegasus' local state (override with PEGASUS_HOME)."""
+    path = os.environ.get('PEGASUS_HOME') or os.path.join(os.path.expanduser('~'), '.pegasus')
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def normalize_query(q):
+    return re.sub(r'\s+', ' ', q).strip().lower()
+
+
+@dataclass
+class CacheEntry:
+    value: bytes
+    meta: dict
+    expires: float
+    etag: str = None
+    last_modified: str = None
+
+    @property
+    def fresh(self):
+        return self.expires > time.time()
+
+    def validators(self):
+        """Conditional request headers for revalidating a stale entry."""
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers or None
+
+
+@dataclass
+class CacheStats:
+    """Hit/miss counters. Each Cache keeps process-wide ones; a run passes its
+    own to get()/refresh() so concurrent runs are counted apart."""
+    hits: int = 0
+    misses: int = 0
+    revalidated: int = 0
+    by_namespace: dict = field(default_factory=dict)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    def record(self, ns, outcome):
+        with self._lock:
+            setattr(self, outcome, getattr(self, outcome) + 1)
+            counts = self.by_namespace.setdefault(ns, {'hits': 0, 'misses': 0, 'revalidated': 0})
+            counts[outcome] += 1
+
+    def counts(self, ns):
+        """Copy of one namespace's counters (all zero if it was never used)."""
+        with self._lock:
+            return dict(self.by_namespace.get(ns, {'hits': 0, 'misses': 0, 'revalidated': 0}))
+
+
+class Cache:
+    def __init__(self, path=None, max_bytes=512 * 1024 * 1024):
+        self.path = path or os.path.join(data_dir(), 'cache.db')
+        self.max_bytes = max_bytes
+        self.stats = CacheStats()
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS blobs (
+                hash TEXT PRIMARY KEY,
+                data BLOB NOT NULL,
+                size INTEGER NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS entries (
+                ns TEXT NOT NULL,
+                key TEXT NOT NULL,
+                blob TEXT NOT NULL,
+                meta TEXT,
+                etag TEXT,
+                last_modified TEXT,
+                created REAL NOT NULL,
+                accessed REAL NOT NULL,
+                expires REAL NOT NULL,
+                PRIMARY KEY (ns, key)
+            );
+            CREATE INDEX IF NOT EXISTS entries_accessed ON entries(accessed);
+            CREATE INDEX IF NOT EXISTS entries_blob ON entries(blob);
+        """)
+        self._size = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM blobs").fetchone()[0]
+
+    # -----------------
+    # Public API
+    # -----------------
+    def get(self, ns, key, allow_stale=False, stats=None):
+        """Return a CacheEntry, or None on a miss.
+
+        Stale entries count as misses but are still returned with
+        allow_stale=True so the caller can revalidate them. The outcome is
+        also counted in `stats`, if given.
+        """
+        now = time.time()
+        with self._lock:
+            row = self._db.execute(
+                "SELECT b.data, e.meta, e.expires, e.etag, e.last_modified FROM entries e "
+                "JOIN blobs b ON b.hash = e.blob WHERE e.ns = ? AND e.key = ?",
+                (ns, key)
+            ).fetchone()
+            outcome = 'misses' if row is None or row[2] <= now else 'hits'
+            self._record(ns, outcome, stats)
+            if row is None or (outcome == 'misses' and not allow_stale):
+                return None
+            self._db.execute("UPDATE entries SET accessed = ? WHERE ns = ? AND key = ?", (now, ns, key))
+        return CacheEntry(zlib.decompress(row[0]), json.loads(row[1] or '{}'), row[2], row[3], row[4])
+
+    def put(self, ns, key, value, ttl, meta=None, etag=None, last_modified=None):
+        digest = hashlib.sha256(value).hexdigest()
+        now = time.time()
+        with self._lock:
+            if not self._db.execute("SELECT 1 FROM blobs WHERE hash = ?", (digest,)).fetchone():
+                data = zlib.compress(value, 6)
+                self._db.execute("INSERT INTO blobs (hash, data, size) VALUES (?, ?, ?)", (digest, data, len(data)))
+                self._size += len(data)
+            self._db.execute(
+                "INSERT OR REPLACE INTO entries (ns, key, blob, meta, etag, last_modified, created, accessed, expires) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (ns, key, digest, json.dumps(meta or {}), etag, last_modified, now, now, now + ttl)
+            )
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def refresh(self, ns, key, ttl, stats=None):
+        """Extend a revalidated (304 Not Modified) entry."""
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "UPDATE entries SET expires = ?, accessed = ? WHERE ns = ? AND key = ?",
+                (now + ttl, now, ns, key)
+            )
+            self._record(ns, 'revalidated', stats)
+
+    def get_json(self, ns, key, stats=None):
+        entry = self.get(ns, key, stats=stats)
+        return json.loads(entry.value) if entry else None
+
+    def put_json(self, ns, key, obj, ttl):
+        self.put(ns, key, json.dumps(obj).encode('utf-8'), ttl)
+
+    def clear(self, ns=None):
+        with self._lock:
+            if ns is None:
+                self._db.execute("DELETE FROM entries")
+            else:
+                self._db.execute("DELETE FROM entries WHERE ns = ?", (ns,))
+            self._drop_orphans()
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def _record(self, ns, outcome, stats):
+        self.stats.record(ns, outcome)
+        if stats is not None:
+            stats.record(ns, outcome)
+
+    # -----------------
+    # Eviction
+    # -----------------
+    def _evict(self):
+        # Expired entries that cannot be revalidated go first, then least recently used
+        self._db.execute(
+            "DELETE FROM entries WHERE expires <= ? AND etag IS NULL AND last_modified IS NULL",
+            (time.time(),)
+        )
+        self._drop_orphans()
+        target = int(self.max_bytes * 0.9)
+        while self._size > target:
+            keys = self._db.execute("SELECT ns, key FROM entries ORDER BY accessed LIMIT 64").fetchall()
+            if not keys:
+                break
+            self._db.executemany("DELETE FROM entries WHERE ns = ? AND key = ?", keys)
+            self._drop_orphans()
+
+    def _drop_orphans(self):
+        self._db.execute("DELETE FROM blobs WHERE hash NOT IN (SELECT blob FROM entries)")
+        self._size = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM blobs").fetchone()[0]
+
+
+_caches = {}
+_cache_lock = threading.Lock()
+
+
+def get_cache(name='cache', max_bytes=512 * 1024 * 1024):
+    """Process-wide shared Cache stored as <data_dir>/<name>.db, opened on first use."""
+    with _cache_lock:
+        if name not in _caches:
+            _caches[name] = Cache(os.path.join(data_dir(), f'{name}.db'), max_bytes=max_bytes)
+        return _caches[name]
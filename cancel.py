@@ -0,0 +1,63 @@
+import threading
+from contextlib import contextmanager
+
+# ---------------------------
+# Cooperative cancellation
+# ---------------------------
+# One CancelToken per run. Work checks it between steps; blocking waits (slot
+# queues, backoff sleeps, HTTP requests on the fetcher loop) register a hook
+# so cancelling wakes or aborts them at once instead of at the next check.
+
+
+class Cancelled(Exception):
+    pass
+
+
+class CancelToken:
+    def __init__(self):
+        self._event = threading.Event()
+        self._hooks = []
+        self._lock = threading.Lock()
+
+    @property
+    def cancelled(self):
+        return self._event.is_set()
+
+    def cancel(self):
+        """Cancel the run; hooks run once, on the calling thread."""
+        with self._lock:
+            if self._event.is_set():
+                return
+            self._event.set()
+            hooks, self._hooks = self._hooks, []
+        for fn in hooks:
+            try:
+                fn()
+            except Exception:
+                pass
+
+    def check(self):
+        if self._event.is_set():
+            raise Cancelled("Run cancelled")
+
+    def sleep(self, seconds):
+        """time.sleep that returns early, raising Cancelled, when the token is cancelled."""
+        if self._event.wait(seconds):
+            raise Cancelled("Run cancelled")
+
+    @contextmanager
+    def hook(self, fn):
+        """Call fn() if the token is cancelled while the block runs (immediately if it already is)."""
+        with self._lock:
+            registered = not self._event.is_set()
+            if registered:
+                self._hooks.append(fn)
+        if not registered:
+            fn()
+        try:
+            yield
+        finally:
+            if registered:
+                with self._lock:
+                    if fn in self._hooks:
+                        self._hooks.remove(fn)
@@ -0,0 +1,55 @@
+import os
+
+import plotly
+from PyQt5.QtCore import QUrl
+from PyQt5.QtWebEngineWidgets import QWebEngineView
+
+# ---------------------------
+# Reusable chart host
+# ---------------------------
+# Each view loads a small host page once, with the plotly.js bundled in the
+# plotly package (no CDN, works offline). Figures are pushed in as JSON and
+# drawn with Plotly.react, so new data and new runs never reload the page.
+
+PLOTLY_DIR = os.path.join(os.path.dirname(plotly.__file__), 'package_data')
+
+HOST_HTML = """<!DOCTYPE html>
+<html><head><meta charset="utf-8">
+<script src="plotly.min.js"></script>
+<style>html, body, #chart { margin: 0; width: 100%; height: 100%; }</style>
+</head><body><div id="chart"></div>
+<script>
+function render(fig) {
+    Plotly.react('chart', fig.data || [], fig.layout || {}, {responsive: true, displaylogo: false});
+}
+</script></body></html>
+"""
+
+
+class ChartView(QWebEngineView):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._ready = False
+        self._pending = None  # last script sent before the host page finished loading
+        self.loadFinished.connect(self._on_loaded)
+        # Relative to the base URL, so the script resolves to the local bundle
+        self.setHtml(HOST_HTML, QUrl.fromLocalFile(PLOTLY_DIR + os.sep))
+
+    def show_figure(self, fig):
+        """Draw a plotly Figure (or its JSON string), replacing what is shown."""
+        data = fig if isinstance(fig, str) else fig.to_json()
+        self._run(f"render({data});")
+
+    def _run(self, script):
+        if self._ready:
+            self.page().runJavaScript(script)
+        else:
+            # Only the latest state matters; earlier updates would be overdrawn anyway
+            self._pending = script
+
+    def _on_loaded(self, ok):
+        self._ready = ok
+        if ok and self._pending:
+            self.page().runJavaScript(self._pending)
+            self._pending = None
+
@@ -0,0 +1,142 @@
+import argparse
+import json
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import extract
+from engine import ResearchEngine
+from llm import CACHE_MODES
+from runstore import RunStore
+
+# ---------------------------
+# Headless batch runner
+# ---------------------------
+# python cli.py "Acme Corp" "Globex" -o reports -j 4
+# python cli.py -f targets.txt -o reports
+# python cli.py --resume 20260101-120000-ab12cd -o reports
+#
+# Each target runs in its own process and writes <out>/<slug>-<run id>/report.md,
+# charts.json, vectors.json and trace.json (Chrome trace of the run). The run id
+# keeps targets with the same slug ("AT&T", "AT T") apart; a resumed run writes
+# back into the directory of the run it continues.
+
+
+def slugify(target):
+    return re.sub(r'[^a-z0-9]+', '-', target.lower()).strip('-') or 'target'
+
+
+def write_outputs(engine, out_root):
+    name = slugify(engine.target)
+    if engine.run_id:
+        name += '-' + engine.run_id
+    out_dir = os.path.join(out_root, name)
+    os.makedirs(out_dir, exist_ok=True)
+    with open(os.path.join(out_dir, 'report.md'), 'w', encoding='utf-8') as f:
+        f.write(f"# DiliGenix Intelligence Report: {engine.target}\n\n")
+        for title, content in engine.sections:
+            f.write(f"## {title}\n\n{content}\n\n")
+    with open(os.path.join(out_dir, 'charts.json'), 'w', encoding='utf-8') as f:
+        json.dump(engine.chart_data, f, indent=2)
+    with open(os.path.join(out_dir, 'vectors.json'), 'w', encoding='utf-8') as f:
+        # Keep the generated query order rather than completion order
+        vectors = [engine.vectors[q] for q in engine.queries if q in engine.vectors]
+        json.dump(vectors, f, indent=2)
+    engine.tracer.export(os.path.join(out_dir, 'trace.json'))
+    return out_dir
+
+
+def run_target(target, out_root, options, verbose, run_id=None):
+    def on_event(kind, *args):
+        if verbose and kind == 'log':
+            print(f"[{target}] {args[0]}: {args[1]}", file=sys.stderr, flush=True)
+
+    engine = ResearchEngine(target, on_event=on_event, run_id=run_id, **options)
+    try:
+        ok = engine.run()
+        # Partial results are still written so a failed target can be inspected
+        out_dir = write_outputs(engine, out_root)
+    finally:
+        # Pool workers exit without atexit handlers; an extraction pool left
+        # running would keep this worker, and the batch, from ever finishing
+        extract.shutdown()
+    return target, ok, out_dir, None if ok else str(engine.error), engine.run_id
+
+
+def read_targets(args):
+    targets = list(args.targets)
+    if args.file:
+        f = sys.stdin if args.file == '-' else open(args.file, encoding='utf-8')
+        with f:
+            targets += [line.strip() for line in f if line.strip() and not line.startswith('#')]
+    # Drop duplicates but keep order
+    return list(dict.fromkeys(targets))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run Pegasus research headlessly for many targets.")
+    parser.add_argument('targets', nargs='*', help="subjects to analyse")
+    parser.add_argument('-f', '--file', help="file with one target per line ('-' for stdin)")
+    parser.add_argument('-o', '--out', default='reports', help="output directory (default: reports)")
+    parser.add_argument('-j', '--jobs', type=int, default=2, help="targets run in parallel processes (default: 2)")
+    parser.add_argument('--vector-workers', type=int, default=4)
+    parser.add_argument('--page-workers', type=int, default=3)
+    parser.add_argument('--section-workers', type=int, default=4)
+    parser.add_argument('--results-per-vector', type=int, default=3, help="search results fetched per vector")
+    parser.add_argument('--page-chars', type=int, default=2000, help="extracted characters kept per page")
+    parser.add_argument('--map-fanout', type=int, default=4, help="sources condensed together per map call")
+    parser.add_argument('--map-depth', type=int, default=2, help="max condensing rounds per vector")
+    parser.add_argument('--llm-cache', choices=CACHE_MODES, default=None)
+    parser.add_argument('--max-llm-requests', type=int, default=None, help="per-target LLM request budget")
+    parser.add_argument('--max-llm-tokens', type=int, default=None, help="per-target LLM token budget")
+    parser.add_argument('--resume', action='append', default=[], metavar='RUN_ID',
+                        help="resume a stored run (a finished one is re-exported without recomputing)")
+    parser.add_argument('--list-runs', action='store_true', help="list stored runs and exit")
+    parser.add_argument('-v', '--verbose', action='store_true', help="stream agent logs to stderr")
+    args = parser.parse_args(argv)
+
+    # A private connection: forked workers must not inherit an open SQLite handle
+    store = RunStore()
+    if args.list_runs:
+        for run in store.list_runs():
+            print(f"{run['id']}  {run['status']:<8} {run['target']}")
+        return 0
+    jobs = [(t, None) for t in read_targets(args)]
+    for run_id in args.resume:
+        run = store.run(run_id)
+        if run is None:
+            parser.error(f"unknown run: {run_id}")
+        jobs.append((run['target'], run_id))
+    store.close()
+    if not jobs:
+        parser.error("no targets given")
+
+    options = {
+        'vector_workers': args.vector_workers,
+        'page_workers': args.page_workers,
+        'section_workers': args.section_workers,
+        'results_per_vector': args.results_per_vector,
+        'page_chars': args.page_chars,
+        'map_fanout': args.map_fanout,
+        'map_depth': args.map_depth,
+        'llm_cache': args.llm_cache,
+        'max_llm_requests': args.max_llm_requests,
+        'max_llm_tokens': args.max_llm_tokens,
+    }
+    failed = 0
+    # One extraction process per job keeps the machine from being oversubscribed
+    with ProcessPoolExecutor(max_workers=args.jobs, initializer=extract.configure, initargs=(1,)) as pool:
+        futures = [pool.submit(run_target, t, args.out, options, args.verbose, run_id) for t, run_id in jobs]
+        for fut in as_completed(futures):
+            target, ok, out_dir, error, run_id = fut.result()
+            if ok:
+                print(f"DONE   {target} -> {out_dir} (run {run_id})")
+            else:
+                failed += 1
+                print(f"FAILED {target}: {error} (resume with --resume {run_id})")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,199 @@
+import hashlib
+import re
+import threading
+from concurrent.futures import Future
+from dataclasses import dataclass
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+from retrieval import estimate_tokens
+
+# ---------------------------
+# Cross-vector deduplication
+# ---------------------------
+# Search results for one target overlap heavily. URLs are canonicalised so each
+# page is fetched and parsed once per run and shared with every vector that
+# found it; extracted text is SimHashed so syndicated copies under different
+# URLs are recognised. Duplicates are kept out of the summary prompts.
+
+TRACKING_PREFIX = 'utm_'  # utm_source, utm_medium, ...
+TRACKING_PARAMS = {'fbclid', 'gclid', 'dclid', 'msclkid', 'mc_cid', 'mc_eid', 'igshid',
+                   'ref', 'ref_src', 'cmpid', 'ocid', 'spm', '_ga'}
+SIMHASH_BITS = 64
+SIMHASH_DISTANCE = 4   # max differing bits for two texts to count as near-duplicates
+MIN_SIMHASH_WORDS = 40  # shorter texts only match exactly
+
+_word_re = re.compile(r"\w+")
+
+
+def is_tracking_param(name):
+    # Matched exactly: 'ref' must not swallow 'reference' or 'refid'
+    name = name.lower()
+    return name.startswith(TRACKING_PREFIX) or name in TRACKING_PARAMS
+
+
+def canonical_url(url):
+    """Key under which equivalent URLs collide: no scheme, www., fragment or tracking params."""
+    try:
+        parts = urlsplit(url.strip())
+        port = parts.port
+    except ValueError:
+        return url
+    host = (parts.hostname or '').lower()
+    if host.startswith('www.'):
+        host = host[4:]
+    if port and port not in (80, 443):
+        host += f":{port}"
+    path = re.sub(r'/{2,}', '/', parts.path or '/')
+    if len(path) > 1:
+        path = path.rstrip('/')
+    query = sorted(
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if not is_tracking_param(k)
+    )
+    return host + path + ('?' + urlencode(query) if query else '')
+
+
+def simhash(text, bits=SIMHASH_BITS):
+    """SimHash over word 3-gram shingles."""
+    words = _word_re.findall(text.lower())
+    shingles = [' '.join(words[i:i + 3]) for i in range(max(1, len(words) - 2))]
+    weights = [0] * bits
+    for shingle in shingles:
+        h = int.from_bytes(hashlib.blake2b(shingle.encode('utf-8'), digest_size=bits // 8).digest(), 'big')
+        for i in range(bits):
+            weights[i] += 1 if h >> i & 1 else -1
+    return sum(1 << i for i, w in enumerate(weights) if w > 0)
+
+
+def hamming(a, b):
+    return bin(a ^ b).count('1')
+
+
+@dataclass
+class DedupStats:
+    shared_urls: int = 0      # fetches avoided: page already claimed by another vector
+    near_duplicates: int = 0  # pages whose text matched one seen under another URL
+    tokens_saved: int = 0     # duplicate text kept out of summary prompts
+
+
+class Deduper:
+    """Per-run registry of each vector's URLs and page texts. Thread-safe.
+
+    Vectors are numbered in query order and only ever defer to lower numbers:
+    a URL belongs to the first vector whose results list it, and a page is a
+    near-duplicate if a lower vector (or an earlier page of the same one) has
+    the text. The outcome doesn't depend on thread timing, so a rerun builds
+    the same summary prompts. Waiting on lower numbers cannot deadlock as long
+    as vectors are started in order.
+    """
+
+    def __init__(self, distance=SIMHASH_DISTANCE):
+        self.distance = distance
+        self.stats = DedupStats()
+        self._pages = {}   # canonical url -> Future of (text, images), set by the owning vector
+        self._links = {}   # vector index -> Future of its canonical urls
+        self._texts = {}   # vector index -> Future of its original texts as (simhash or None, normalised text)
+        self._lock = threading.Lock()
+
+    def claim(self, index, links):
+        """Register vector `index`'s links; returns a bool per link.
+
+        True links are owned by this vector: the caller fetches them and must
+        publish() each one. False links belong to a lower vector (or repeat an
+        earlier link in the list); their page comes from shared_page(). Waits
+        until every lower vector has claimed its own links.
+        """
+        keys = [canonical_url(link) for link in links]
+        self._resolve(self._links, index, keys)
+        taken = set()
+        for earlier in self._earlier(self._links, index):
+            taken.update(earlier)
+        fresh = []
+        with self._lock:
+            for key in keys:
+                if key in taken:
+                    self.stats.shared_urls += 1
+                    fresh.append(False)
+                else:
+                    taken.add(key)
+                    self._pages.setdefault(key, Future())
+                    fresh.append(True)
+        return fresh
+
+    def publish(self, link, text, images):
+        """Result for a claimed link; None text if it could not be fetched."""
+        with self._lock:
+            future = self._pages.get(canonical_url(link))
+        if future is not None and not future.done():
+            future.set_result((text, images))
+
+    def shared_page(self, link, timeout=None):
+        """(text, images) published by the vector that claimed link, or (None, [])."""
+        with self._lock:
+            future = self._pages.get(canonical_url(link))
+        try:
+            return future.result(timeout)
+        except Exception:
+            return None, []
+
+    def settle(self, index, pages):
+        """Find which of vector `index`'s own (link, text) pages repeat an earlier text.
+
+        Returns the set of repeated links. The other texts are registered for
+        higher vectors to compare against. Waits for every lower vector to settle.
+        """
+        seen = [entry for texts in self._earlier(self._texts, index) for entry in texts]
+        originals, repeats = [], set()
+        for link, text in pages:
+            entry = self._fingerprint(text)
+            if any(self._similar(entry, other) for other in seen + originals):
+                repeats.add(link)
+                with self._lock:
+                    self.stats.near_duplicates += 1
+            else:
+                originals.append(entry)
+        self._resolve(self._texts, index, originals)
+        return repeats
+
+    def remember(self, index, links, texts):
+        """Register the pages of a vector restored from a saved run, without counting them."""
+        keys = [canonical_url(link) for link in links]
+        with self._lock:
+            for key, text in zip(keys, texts):
+                future = self._pages.setdefault(key, Future())
+                if not future.done():
+                    future.set_result((text, []))
+        self._resolve(self._links, index, keys)
+        self._resolve(self._texts, index, [self._fingerprint(text) for text in texts])
+
+    def close(self, index):
+        """Mark vector `index` as done; a vector that failed early then holds no URLs or texts."""
+        self._resolve(self._links, index, [])
+        self._resolve(self._texts, index, [])
+
+    def _slot(self, table, index):
+        with self._lock:
+            return table.setdefault(index, Future())
+
+    def _resolve(self, table, index, value):
+        # First value wins; close() after claim()/settle() leaves theirs in place
+        future = self._slot(table, index)
+        with self._lock:
+            if not future.done():
+                future.set_result(value)
+
+    def _earlier(self, table, index):
+        return [self._slot(table, j).result() for j in range(index)]
+
+    @staticmethod
+    def _fingerprint(text):
+        norm = ' '.join(text.split()).lower()
+        return simhash(norm) if len(norm.split()) >= MIN_SIMHASH_WORDS else None, norm
+
+    def _similar(self, a, b):
+        (h, norm), (other_h, other_norm) = a, b
+        return norm == other_norm or (h is not None and other_h is not None and hamming(h, other_h) <= self.distance)
+
+    def saved(self, text):
+        with self._lock:
+            self.stats.tokens_saved += estimate_tokens(text)
@@ -0,0 +1,695 @@
+import ast
+import json
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from cache import CacheStats, get_cache, normalize_query
+from cancel import CancelToken, Cancelled
+from dedup import Deduper
+from extract import extract_many
+from fetcher import FetchResult, get_fetcher
+from llm import CachedClient, CancellableClient
+from retrieval import CHARS_PER_TOKEN, BM25Index, estimate_tokens
+from runstore import get_run_store
+from scheduler import (PRIORITY_INTEL, PRIORITY_OPTIONAL, PRIORITY_PLAN, PRIORITY_REPORT, RunBudget,
+                       ScheduledClient, get_scheduler)
+from tracing import Tracer
+
+# ---------------------------
+# Research engine (Qt-independent)
+# ---------------------------
+# The whole pipeline reports through a single on_event(kind, *args) callback.
+# Event kinds mirror the GUI agent's signals: log, query, url, vector_intel,
+# vector_intel_delta, master_section, master_section_delta, analytical, chart,
+# image, progress, finished. Callbacks may arrive from worker threads.
+# Stage timings are recorded as spans on engine.tracer. Completed steps are
+# saved to the run store as they land, so a run can be resumed or replayed.
+# stop() cancels the run: in-flight fetches and model calls are aborted and the
+# run ends as 'cancelled', resumable like a failed one.
+
+SEARCH_TTL = 24 * 3600    # DDGS results
+PAGE_TTL = 3 * 24 * 3600  # fetched pages; revalidated with ETag/Last-Modified after expiry
+STREAM_INTERVAL = 0.05    # min seconds between streamed-text events
+
+SECTION_CONTEXT_TOKENS = 2000  # retrieved intel packed into each section prompt
+CHART_CONTEXT_TOKENS = 3000
+CHART_QUERY = (
+    "market size revenue growth rate share users forecast billion percent year "
+    "political economic social technological legal environmental regulation "
+    "moat brand network effects switching costs scale patents competitive advantage"
+)
+
+
+def ddgs_search(q, max_results):
+    from ddgs import DDGS  # deferred: only needed when a search actually misses the cache
+
+    return DDGS().text(q, max_results=max_results)
+
+
+def total_tokens(texts):
+    return sum(estimate_tokens(t) for t in texts)
+
+
+def clip_to_budget(texts, budget_tokens):
+    """Keep texts in order until the budget is spent, cutting the last one short."""
+    out = []
+    left = budget_tokens * CHARS_PER_TOKEN
+    for text in texts:
+        if left <= 0:
+            break
+        out.append(text[:left])
+        left -= len(text)
+    return out
+
+
+def group_by_budget(texts, fanout, budget_tokens):
+    """Greedy groups of at most `fanout` texts, each group within the budget."""
+    groups = [[]]
+    used = 0
+    for text in texts:
+        cost = estimate_tokens(text)
+        if groups[-1] and (len(groups[-1]) >= fanout or used + cost > budget_tokens):
+            groups.append([])
+            used = 0
+        groups[-1].append(text)
+        used += cost
+    return groups
+
+
+class OrderedSections:
+    """Reassembly buffer for sections generated out of order.
+
+    Finished sections are released to on_section strictly in index order. Only
+    the head-of-line section streams live through on_delta; later ones buffer
+    their partial text and replay it once they reach the head.
+    """
+
+    def __init__(self, titles, on_delta, on_section):
+        self.titles = titles
+        self.on_delta = on_delta
+        self.on_section = on_section
+        self.partial = {}
+        self.finished = {}
+        self.head = 0
+        self.lock = threading.Lock()
+
+    def delta(self, i, text):
+        with self.lock:
+            self.partial[i] = self.partial.get(i, "") + text
+            if i == self.head:
+                self.on_delta(self.titles[i], text)
+
+    def complete(self, i, content):
+        with self.lock:
+            self.finished[i] = content
+            while self.head in self.finished:
+                content = self.finished.pop(self.head)
+                self.partial.pop(self.head, None)
+                self.head += 1
+                self.on_section(self.titles[self.head - 1], content, self.head, len(self.titles))
+                # Catch the new head up on what it has streamed so far
+                if self.head < len(self.titles) and self.head not in self.finished and self.partial.get(self.head):
+                    self.on_delta(self.titles[self.head], self.partial[self.head])
+
+
+class ResearchEngine:
+    """Runs one research target end to end and reports progress via on_event.
+
+    Results are also kept on the engine for headless consumers: `queries`,
+    `vectors` (query -> urls/summary/images/analytical html), `sections`
+    (title, content) in report order and the parsed `chart_data`. `tracer`
+    holds the run's timing spans.
+
+    Pass the `run_id` of a stored run to resume it: saved steps are replayed
+    through on_event and only the missing ones are computed. `cancel` is the
+    run's CancelToken (one is created if not given); see stop().
+    """
+
+    def __init__(self, target, on_event=None, vector_workers=4, page_workers=3, vector_deadline=15.0, section_workers=4,
+                 results_per_vector=3, page_chars=2000, map_fanout=4, map_depth=2, map_workers=4,
+                 summary_budget_tokens=2000, llm_cache=None, llm_host=None, search_backend=None,
+                 run_store=None, run_id=None, max_llm_requests=None, max_llm_tokens=None, cancel=None):
+        self.target = target
+        self.on_event = on_event
+        self.vector_workers = vector_workers    # vectors mined in parallel
+        self.page_workers = page_workers        # pages fetched in parallel per vector
+        self.vector_deadline = vector_deadline  # seconds allowed for all page fetches of one vector
+        self.section_workers = section_workers  # master sections (and chart prompt) generated in parallel
+        self.results_per_vector = results_per_vector  # search results (pages) per vector
+        self.page_chars = page_chars                  # extracted text kept per page
+        self.map_fanout = map_fanout                  # max sources condensed together in one map call
+        self.map_depth = map_depth                    # max condensing rounds before the final reduce
+        self.map_workers = map_workers                # map calls in flight per vector
+        self.summary_budget_tokens = summary_budget_tokens  # input budget of any summary prompt
+        self.fetcher = get_fetcher()
+        self.cache = get_cache()
+        self.search_backend = search_backend or ddgs_search
+        self.store = run_store or get_run_store()
+        self.run_id = run_id  # set when the run starts unless resuming
+        self.saved = {}       # steps loaded from the store: {kind: {key: data}}
+        self.dedup = Deduper()
+        self.analytical_pool = None  # infographics run beside the report, at low priority
+        self.analytical_futures = []
+        self.tracer = Tracer()
+        self.cache_stats = CacheStats()  # this run's cache hits/misses; the caches are shared
+        self.cancel = cancel or CancelToken()
+        # Cache hits never reach the scheduler; misses queue for a slot by priority
+        self.budget = RunBudget(max_llm_requests, max_llm_tokens)
+        self.scheduler = get_scheduler()
+        self.transport = CancellableClient(
+            host=llm_host or os.environ.get('PEGASUS_LLM_HOST', 'https://ollama.com'),
+            headers={'Authorization': f"Bearer {os.environ.get('OLLAMA_API_KEY')}"},
+            cancel=self.cancel
+        )
+        self.client = CachedClient(ScheduledClient(self.transport, self.scheduler, self.budget, self.cancel),
+                                   mode=llm_cache, tracer=self.tracer, stats=self.cache_stats)
+        self.model = 'gpt-oss:120b'
+        self.vector_summaries = []
+        self.queries = []
+        self.vectors = {}
+        self.sections = []
+        self.chart_data = None
+        self.error = None
+
+    def stop(self):
+        """Cancel the run from any thread; run() returns False soon after."""
+        self.cancel.cancel()
+
+    def emit(self, kind, *args):
+        if self.on_event:
+            self.on_event(kind, *args)
+
+    def run(self):
+        """Run the full pipeline. Returns False (and sets self.error) on failure."""
+        try:
+            self.emit('log', "SYSTEM", f"AGENT DEPLOYED: {self.target}")
+            self.start_run()
+
+            # --- Phase 1: Generate Research Vectors ---
+            queries = self.saved.get('queries', {}).get('')
+            if queries is None:
+                with self.tracer.span('vectors', 'phase'):
+                    queries = self.generate_queries()
+                self.store.save(self.run_id, 'queries', '', queries)
+            self.queries = queries
+            self.cancel.check()
+
+            # --- Phase 2: Gather Vector Intelligence ---
+            # Vectors are mined concurrently; results land out of order, so
+            # summaries are slotted back by index to keep the master context stable.
+            summaries = [None] * len(queries)
+            done = 0
+            self.analytical_pool = ThreadPoolExecutor(max_workers=self.vector_workers)
+            with self.tracer.span('mining', 'phase'), ThreadPoolExecutor(max_workers=self.vector_workers) as pool:
+                futures = {pool.submit(self.mine_vector, idx, q): idx for idx, q in enumerate(queries)}
+                for fut in as_completed(futures):
+                    idx = futures[fut]
+                    try:
+                        summaries[idx] = fut.result()
+                    except Cancelled:
+                        raise
+                    except Exception as e:
+                        self.emit('log', "WARN", f"Vector failed: {queries[idx]} ({e})")
+                    done += 1
+                    self.emit('progress', int((done/len(queries))*50))
+            self.cancel.check()
+            self.vector_summaries = [s for s in summaries if s]
+            self.log_cache_stats('search', 'page')
+            stats = self.dedup.stats
+            self.emit(
+                'log',
+                "DEDUP",
+                f"{stats.shared_urls} repeated URLs fetched once, {stats.near_duplicates} near-duplicate pages, "
+                f"~{stats.tokens_saved} summary tokens saved"
+            )
+
+            # --- Phase 3: Master Section + Charts ---
+            # Each prompt gets the intel chunks most relevant to its own topic. Sections
+            # and the chart prompt are independent, so they run concurrently;
+            # OrderedSections re-serialises delivery.
+            report_sections = [
+                ("Executive Summary","High-level overview"),
+                ("SWOT Analysis","Strengths, Weaknesses, Opportunities, Threats"),
+                ("PESTLE Analysis","Political, Economic, Social, Technological, Legal, Environmental"),
+                ("Porter's Five Forces","Industry competitiveness"),
+                ("Moat & Defensibility","Long-term advantage"),
+                ("Competitive Landscape","Market share & competitors"),
+                ("Strategic Outlook","Projections 2026-2030")
+            ]
+            index = self.build_index()
+            titles = [title for title, _ in report_sections]
+            ordered = OrderedSections(titles, lambda t, d: self.emit('master_section_delta', t, d), self.on_section_ready)
+            with self.tracer.span('report', 'phase'), ThreadPoolExecutor(max_workers=self.section_workers) as pool:
+                chart_future = pool.submit(self.build_charts, index)
+                futures = [
+                    pool.submit(self.write_section, i, title, instruction, index, ordered)
+                    for i, (title, instruction) in enumerate(report_sections)
+                ]
+                for fut in futures:
+                    fut.result()
+                # Charts are a side panel; a bad chart reply should not sink the report
+                try:
+                    chart_future.result()
+                except Cancelled:
+                    raise
+                except Exception as e:
+                    self.emit('log', "WARN", f"Charts failed: {e}")
+
+            for fut in self.analytical_futures:
+                fut.result()
+            self.analytical_pool.shutdown()
+            self.cancel.check()
+
+            self.store.set_status(self.run_id, 'done')
+            self.log_cache_stats('llm')
+            self.log_llm_stats()
+            self.tracer.finish()
+            self.emit('log', "TIMING", self.tracer.summary_line())
+            self.emit('progress', 100)
+            self.emit('finished')
+            self.emit('log', "SUCCESS", "All sections, charts, and analytical maps generated.")
+            return True
+
+        except Exception as e:
+            self.error = e
+            self.tracer.finish()
+            if self.analytical_pool:
+                self.analytical_pool.shutdown(wait=False, cancel_futures=True)
+            cancelled = isinstance(e, Cancelled)
+            self.cancel.cancel()  # stop whatever is still in flight (analytical maps, sibling calls)
+            if cancelled:
+                self.emit('log', "SYSTEM", "Run stopped.")
+            else:
+                self.emit('log', "ERROR", f"Agent Error: {str(e)}")
+            if self.run_id:
+                self.store.set_status(self.run_id, 'cancelled' if cancelled else 'failed', str(e))
+                self.emit('log', "SYSTEM", f"Completed steps are saved; resume run {self.run_id} to continue.")
+            return False
+
+    def start_run(self):
+        """Open a new run in the store, or load the saved steps of the one being resumed."""
+        if self.run_id is None:
+            self.run_id = self.store.create_run(self.target)
+            self.emit('log', "SYSTEM", f"Run {self.run_id} saved as it progresses")
+            return
+        self.saved = self.store.load(self.run_id)
+        self.store.set_status(self.run_id, 'running')
+        counts = ", ".join(f"{len(v)} {k}" for k, v in sorted(self.saved.items()))
+        self.emit('log', "SYSTEM", f"Resuming run {self.run_id} ({counts or 'nothing saved'})")
+
+    def generate_queries(self):
+        v_prompt = (
+            f"Generate a Python list of exactly 7 distinct market research queries "
+            f"for deep due diligence on: {self.target}. Return ONLY the Python list."
+        )
+        resp = self.client.chat(self.model, messages=[{'role': 'user', 'content': v_prompt}], priority=PRIORITY_PLAN)
+        try:
+            match = re.search(r'\[.*\]', resp['message']['content'], re.DOTALL)
+            return ast.literal_eval(match.group(0)) if match else [self.target]
+        except:
+            return [self.target + " analysis", self.target + " competitors"]
+
+    def build_index(self):
+        """BM25 index over vector summaries and the page text behind them."""
+        index = BM25Index()
+        indexed = set()
+        for q in self.queries:
+            record = self.vectors.get(q)
+            if not record or not record['summary']:
+                continue
+            index.add(f"{q} / summary", record['summary'])
+            for url, text in zip(record.get('sources', record['urls']), record['texts']):
+                # Pages shared between vectors are indexed once
+                if url not in indexed:
+                    indexed.add(url)
+                    index.add(url, text)
+        return index
+
+    def write_section(self, i, title, instruction, index, ordered):
+        section_txt = self.saved.get('section', {}).get(title)
+        if section_txt is None:
+            self.emit('log', "AI", f"Streaming Master Section: {title}")
+            context = index.pack(f"{title} {instruction} {self.target}", SECTION_CONTEXT_TOKENS)
+            section_prompt = (
+                f"Write '{title}' section for {self.target} using ONLY below research data:\n"
+                f"{context}"
+            )
+            section_txt = self.stream_chat(section_prompt, lambda d: ordered.delta(i, d), PRIORITY_REPORT)
+            self.store.save(self.run_id, 'section', title, section_txt)
+        ordered.complete(i, section_txt)
+
+    def on_section_ready(self, title, content, delivered, total):
+        self.sections.append((title, content))
+        self.emit('master_section', title, content)
+        self.emit('progress', 48+int((delivered/total)*48))
+
+    def build_charts(self, index):
+        """Chart JSON prompt and figures. Independent of the master sections."""
+        chart_data = self.saved.get('charts', {}).get('')
+        if chart_data is None:
+            chart_data = self.request_chart_data(index.pack(CHART_QUERY, CHART_CONTEXT_TOKENS))
+            if chart_data is None:
+                self.emit('log', "WARN", "No valid JSON found in chart response")
+                return
+            self.store.save(self.run_id, 'charts', '', chart_data)
+        with self.tracer.span('build_charts', 'chart'):
+            self.plot_charts(chart_data)
+
+    def request_chart_data(self, context):
+        self.emit('log', "System", "Generating market projection data...")
+
+        chart_prompt = (
+            "From the following research data, estimate plausible numerical data for plotting:\n"
+            "- market_variation: 5–8 time periods (e.g. years or quarters) with market-related values (e.g. market size in $B, growth rate, users, etc.)\n"
+            "- pestle scores\n"
+            "- moat/defensibility parameters\n\n"
+            "Return STRICT JSON only in this exact format:\n"
+            "{\n"
+            '  "market_variation": {\n'
+            '    "labels": ["2020", "2021", "2022", "2023", "2024", "2025"],\n'
+            '    "values": [number, number, number, number, number, number]\n'
+            '  },\n'
+            '  "pestle": {\n'
+            '    "political": number,\n'
+            '    "environmental": number,\n'
+            '    "social": number,\n'
+            '    "technological": number,\n'
+            '    "legal": number,\n'
+            '    "economic": number\n'
+            '  },\n'
+            '  "moat": {\n'
+            '    "parameter as needed along with value in number"\n'
+            '  }\n'
+            "}\n\n"
+            "Use only the provided research context. Do not include commentary.\n\n"
+            f"RESEARCH DATA:\n{context}"
+        )
+
+        chart_resp = self.client.chat(self.model, messages=[{'role': 'user', 'content': chart_prompt}], priority=PRIORITY_REPORT)
+        json_match = re.search(r"\{.*\}", chart_resp["message"]["content"], re.DOTALL)
+        return json.loads(json_match.group(0)) if json_match else None
+
+    def plot_charts(self, chart_data):
+        """Emit the figures for parsed chart data."""
+        import plotly.graph_objects as go  # deferred: slow to import and only needed once per run
+
+        self.chart_data = chart_data
+
+        mv = chart_data.get('market_variation', {})
+        if 'labels' in mv and 'values' in mv:
+            fig2 = go.Figure()
+            fig2.add_trace(go.Scatter(
+                x=mv['labels'],
+                y=mv['values'],
+                mode='lines+markers',
+                name='Market Trend',
+                line=dict(color='#1f77b4', width=2.5),
+                marker=dict(size=8)
+            ))
+            fig2.update_layout(
+                title="Market Variation Over Time",
+                xaxis_title="Period",
+                yaxis_title="Value ($B / mln users / % growth …)",
+                showlegend=True,
+                autosize=True,
+                template="plotly_white"
+            )
+            self.emit('chart', "Market", fig2)
+        else:
+            self.emit('log', "WARN", "market_variation data missing or invalid")
+
+
+        pestle = chart_data.get('pestle', {})
+        if pestle:
+            fig3 = go.Figure()
+            fig3.add_trace(go.Scatterpolar(
+                r=list(pestle.values()),
+                theta=list(pestle.keys()),
+                fill='toself',
+                name="PESTLE",
+                fillcolor='rgba(85, 255, 85, 0.25)'
+            ))
+            fig3.update_layout(
+                title="PESTLE Analysis",
+                polar=dict(radialaxis=dict(visible=True, range=[0, 10])),
+                showlegend=True,
+                autosize=True
+            )
+            self.emit('chart', "PESTLE", fig3)
+
+
+        moat = chart_data.get('moat', {})
+        if moat:
+            fig4 = go.Figure([go.Bar(
+                x=list(moat.keys()),
+                y=list(moat.values()),
+                marker_color="#ffaa00",
+                text=[f"{v}%" for v in moat.values()],
+                textposition='auto'
+            )])
+            fig4.update_layout(
+                title="Moat & Defensibility",
+                yaxis=dict(range=[0, 100], title="Strength (%)"),
+                xaxis_title="Moat Components",
+                autosize=True,
+                bargap=0.3
+            )
+            self.emit('chart', "Moat", fig4)
+
+    def stream_chat(self, prompt, on_delta, priority=PRIORITY_INTEL):
+        """Streamed chat call returning the full text.
+
+        Chunks are coalesced to at most one on_delta call per STREAM_INTERVAL
+        so the GUI event queue is not flooded with per-token signals.
+        """
+        pending = []
+        last = [time.monotonic()]
+
+        def push(piece):
+            pending.append(piece)
+            now = time.monotonic()
+            if now - last[0] >= STREAM_INTERVAL:
+                on_delta(''.join(pending))
+                pending.clear()
+                last[0] = now
+
+        resp = self.client.chat_stream(self.model, messages=[{'role':'user','content':prompt}], on_delta=push, priority=priority)
+        if pending:
+            on_delta(''.join(pending))
+        return resp['message']['content']
+
+    def log_cache_stats(self, *namespaces):
+        for ns in namespaces:
+            counts = self.cache_stats.counts(ns)
+            if not any(counts.values()):
+                continue
+            self.emit(
+                'log',
+                "CACHE",
+                f"{ns}: {counts['hits']} hit / {counts['misses']} miss / {counts['revalidated']} revalidated"
+            )
+
+    def mine_vector(self, index, q):
+        """Search, fetch and summarise research vector number `index`. Runs on a pool worker.
+
+        Steps saved by an earlier attempt of this run are replayed, not redone.
+        """
+        self.emit('query', q)
+        self.emit('log', "AI_THOUGHT", f"Mining Vector: {q}")
+
+        try:
+            self.cancel.check()
+            record = self.saved.get('vector', {}).get(q)
+            if record:
+                for link in record['urls']:
+                    self.emit('url', q, link)
+                self.dedup.remember(index, record.get('sources', record['urls']), record['texts'])
+            else:
+                record = {'query': q, 'urls': [], 'sources': [], 'texts': [], 'summary': None, 'images': [], 'analytical': None}
+                try:
+                    results = self.search(q, max_results=self.results_per_vector)
+                    links = record['urls'] = [r['href'] for r in results]
+                    for link in links:
+                        self.emit('url', q, link)
+                    self.gather_pages(index, q, record)
+                except Cancelled:
+                    raise
+                except: pass
+                if record['texts']:
+                    self.save_vector(record)
+        finally:
+            # Higher vectors wait on this one's URLs and texts, even if it failed
+            self.dedup.close(index)
+        self.vectors[q] = record
+
+        if not record['texts']:
+            return None
+
+        if record['summary'] is None:
+            record['summary'] = self.summarize_vector(q, record['texts'], lambda d: self.emit('vector_intel_delta', q, d))
+            self.save_vector(record)
+        intel_txt = record['summary']
+        for img in record['images']:
+            self.emit('image', q, img)
+
+        self.emit('vector_intel', q, intel_txt)
+        self.analytical_futures.append(self.analytical_pool.submit(self.write_analytical, q, record))
+
+        return f"{q}: {intel_txt}"
+
+    def write_analytical(self, q, record):
+        """Infographic for one vector. Optional: a failure is logged, not raised."""
+        if record['analytical'] is None:
+            self.emit('log', "SYSTEM PROCESSING", "Working on the analytical map...")
+
+            analytical_prompt = (
+                "Now for the content generate a CLEAR AND BEAUTIFUL flow diagram or infographics in core html css only NO MARKDOWN just CORE RESPONSIVE HTML CSS in syntax <html><head>...<style>...</style></head><body>...</body></html>"
+                f"{q}\n\n"
+                + "\n".join(record['summary']))
+            try:
+                analytical_intel = self.client.chat(self.model, messages=[{'role':'user','content':analytical_prompt}], priority=PRIORITY_OPTIONAL)
+            except Cancelled:
+                return
+            except Exception as e:
+                self.emit('log', "WARN", f"Analytical map skipped: {q} ({e})")
+                return
+            record['analytical'] = analytical_intel['message']['content']
+            self.save_vector(record)
+        self.emit('analytical', q, record['analytical'])  # first sentence as summary
+
+    def log_llm_stats(self):
+        budget, stats = self.budget, self.scheduler.stats
+        self.emit(
+            'log',
+            "LLM",
+            f"run: {budget.requests} requests / {budget.tokens} tokens | scheduler: concurrency {self.scheduler.limit:.1f}, "
+            f"{stats.retries} retries, {stats.throttled} throttled"
+        )
+
+    def gather_pages(self, index, q, record):
+        """Fill record's sources/texts/images from its URLs, deduplicated across vectors.
+
+        Pages an earlier vector (in query order) also found are not fetched
+        again but shared. Pages that are shared or near-duplicates of an earlier
+        one are kept out of this vector's summary, unless nothing unique would
+        be left.
+        """
+        links = record['urls']
+        fresh = self.dedup.claim(index, links)
+        own = [link for link, new in zip(links, fresh) if new]
+        pages = {}
+        try:
+            fetched = [(link, page.content, page.encoding) for link, page in zip(own, self.fetch_pages(own)) if page]
+            self.cancel.check()
+            with self.tracer.span('extract', 'extract', query=q, pages=len(fetched)):
+                extracted = extract_many(fetched, max_chars=self.page_chars)
+            for (link, _, _), result in zip(fetched, extracted):
+                pages[link] = result
+        finally:
+            # Vectors waiting on these pages must never be left hanging
+            for link in own:
+                self.dedup.publish(link, *pages.get(link, (None, [])))
+
+        repeats = self.dedup.settle(index, [(link, pages[link][0]) for link in own if pages.get(link, (None,))[0]])
+        kept, duplicates = [], []
+        for link, new in zip(links, fresh):
+            text, imgs = pages.get(link, (None, [])) if new else self.dedup.shared_page(link, self.vector_deadline)
+            if not text:
+                continue
+            if not new or link in repeats:
+                duplicates.append((link, text))
+            else:
+                kept.append((link, text))
+                record['images'].extend(imgs)
+        if kept:
+            for _, text in duplicates:
+                self.dedup.saved(text)
+        else:
+            kept = duplicates  # everything was found elsewhere too; summarise it from this vector's angle
+        record['sources'] = [link for link, _ in kept]
+        record['texts'] = [text for _, text in kept]
+
+    def save_vector(self, record):
+        self.store.save(self.run_id, 'vector', record['query'], record)
+
+    def summarize_vector(self, q, texts, on_delta):
+        """Map-reduce summary of a vector's page texts.
+
+        While the texts exceed summary_budget_tokens they are grouped (at most
+        map_fanout per group) and condensed in parallel, up to map_depth rounds.
+        Only the final reduce is streamed.
+        """
+        depth = 0
+        while len(texts) > 1 and total_tokens(texts) > self.summary_budget_tokens and depth < self.map_depth:
+            groups = group_by_budget(texts, self.map_fanout, self.summary_budget_tokens)
+            self.emit('log', "AI_THOUGHT", f"Condensing {len(texts)} sources in {len(groups)} groups for: {q}")
+            with ThreadPoolExecutor(max_workers=self.map_workers) as pool:
+                texts = list(pool.map(lambda g: self.condense(q, g), groups))
+            depth += 1
+
+        sub_prompt = f"Summarize verified intelligence for: {q}.\n" + "\n".join(clip_to_budget(texts, self.summary_budget_tokens))
+        return self.stream_chat(sub_prompt, on_delta)
+
+    def condense(self, q, texts):
+        prompt = (
+            f"Extract the verified facts, figures and claims relevant to: {q}. "
+            "Reply with concise bullet points only.\n"
+            + "\n".join(clip_to_budget(texts, self.summary_budget_tokens))
+        )
+        resp = self.client.chat(self.model, messages=[{'role':'user','content':prompt}], priority=PRIORITY_INTEL)
+        return resp['message']['content']
+
+    def search(self, q, max_results=3):
+        """Web search (DDGS by default), served from the local cache when possible."""
+        key = f"{normalize_query(q)}|{max_results}"
+        with self.tracer.span('search', 'search', query=q) as span:
+            results = self.cache.get_json('search', key, stats=self.cache_stats)
+            span['cached'] = results is not None
+            if results is None:
+                self.cancel.check()
+                results = list(self.search_backend(q, max_results))
+                self.cache.put_json('search', key, results, SEARCH_TTL)
+        return results
+
+    def fetch_pages(self, links):
+        """Fetch pages in search-rank order, consulting the cache before the network."""
+        def cached_page(link, entry):
+            return FetchResult(link, 200, entry.meta.get('content_type', ''), entry.value, entry.meta.get('encoding'))
+
+        pages = [None] * len(links)
+        stale = {}
+        todo = []
+        for i, link in enumerate(links):
+            entry = self.cache.get('page', link, allow_stale=True, stats=self.cache_stats)
+            if entry and entry.fresh:
+                pages[i] = cached_page(link, entry)
+            else:
+                stale[i] = entry
+                todo.append(i)
+
+        # Remaining pages are fetched concurrently; stale entries revalidate via ETag/Last-Modified
+        headers = [stale[i].validators() if stale[i] else None for i in todo]
+        fetched = self.fetcher.fetch_many(
+            [links[i] for i in todo], concurrency=self.page_workers,
+            deadline=self.vector_deadline, headers=headers, tracer=self.tracer, cancel=self.cancel
+        )
+        for i, page in zip(todo, fetched):
+            link, entry = links[i], stale[i]
+            if page is None or (page.status == 304 and not entry):
+                continue
+            if page.status == 304:
+                self.cache.refresh('page', link, PAGE_TTL, stats=self.cache_stats)
+                page = cached_page(link, entry)
+            else:
+                self.cache.put(
+                    'page', link, page.content, PAGE_TTL,
+                    meta={'content_type': page.content_type, 'encoding': page.encoding},
+                    etag=page.etag, last_modified=page.last_modified
+                )
+            pages[i] = page
+        return pages
+
+
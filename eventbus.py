@@ -0,0 +1,57 @@
+import threading
+
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+
+# ---------------------------
+# Coalescing event bus
+# ---------------------------
+# Agent events are buffered and handed to the widgets in timed batches, so a
+# burst of log lines or tree nodes costs one repaint instead of one each.
+# post() may be called from any thread; handlers always run on the GUI thread.
+
+EVENT_FLUSH_MS = 100
+
+
+class EventBus(QObject):
+    _wake = pyqtSignal()
+
+    def __init__(self, interval_ms=EVENT_FLUSH_MS, parent=None):
+        super().__init__(parent)
+        self._handlers = {}  # kind -> handler
+        self._pending = []
+        self._lock = threading.Lock()
+        self._scheduled = False
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(interval_ms)
+        self._timer.timeout.connect(self.flush)
+        self._wake.connect(self._timer.start)  # queued when posted from another thread
+
+    def subscribe(self, kind, handler):
+        """handler(batch) gets a list of argument tuples, in posting order."""
+        self._handlers[kind] = handler
+
+    def post(self, kind, *args):
+        with self._lock:
+            self._pending.append((kind, args))
+            if self._scheduled:
+                return
+            self._scheduled = True
+        self._wake.emit()
+
+    def flush(self):
+        """Deliver everything pending now. Consecutive events of a kind form one batch."""
+        with self._lock:
+            pending, self._pending = self._pending, []
+            self._scheduled = False
+        self._timer.stop()
+        i = 0
+        while i < len(pending):
+            kind = pending[i][0]
+            j = i
+            while j < len(pending) and pending[j][0] == kind:
+                j += 1
+            handler = self._handlers.get(kind)
+            if handler:
+                handler([args for _, args in pending[i:j]])
+            i = j
@@ -0,0 +1,140 @@
+import atexit
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from urllib.parse import urljoin
+
+import lxml.etree
+import lxml.html
+import trafilatura
+
+# ---------------------------
+# Main-content extraction
+# ---------------------------
+# Each page is parsed once with lxml; the same tree feeds image discovery and
+# trafilatura's main-text extraction. Runs in a process pool so parsing stays
+# off the agent threads and the GIL. Workers are started from a forkserver (or
+# spawned): forking this process, with its Qt, fetcher and agent threads, could
+# leave a child holding a lock that no thread will ever release.
+
+MAX_TEXT_CHARS = 2000
+MIN_IMAGE_SIZE = 150
+IMAGE_JUNK = ('/logo', '/icon', '/ads/', '/sprite')
+BOILERPLATE_TAGS = ('script', 'style', 'noscript', 'nav', 'header', 'footer', 'aside', 'form')
+
+
+def extract_page(url, content, encoding='utf-8', max_chars=MAX_TEXT_CHARS):
+    """Return (main text, candidate image URLs) for one raw HTML document."""
+    # lxml gets the bytes: it refuses a str that still carries an XML encoding declaration
+    try:
+        parser = lxml.html.HTMLParser(encoding=encoding or 'utf-8')
+    except LookupError:
+        parser = lxml.html.HTMLParser(encoding='utf-8')
+    try:
+        tree = lxml.html.document_fromstring(content, parser=parser)
+    except (lxml.etree.ParserError, ValueError):
+        return "", []
+
+    images = find_images(url, tree)
+    # trafilatura works on its own copy of the tree
+    text = trafilatura.extract(tree, url=url, fast=True, include_comments=False, include_tables=True)
+    if not text:
+        for el in tree.iter(*BOILERPLATE_TAGS):
+            el.drop_tree()
+        text = ' '.join(tree.text_content().split())
+    return text[:max_chars], images
+
+
+def find_images(url, tree):
+    main_content = tree.find('.//main')
+    if main_content is None:
+        main_content = tree.find('.//article')
+    if main_content is None:
+        main_content = tree
+
+    imgs = []
+    for img in main_content.iter('img'):
+        src = img.get('src') or img.get('data-src')
+        if not src or src.startswith('data:'):
+            continue
+
+        try:
+            src = urljoin(url, src)
+        except ValueError:  # e.g. 'http://[bad'
+            continue
+        width = img.get('width')
+        height = img.get('height')
+        try:
+            if width and height and (int(width) < MIN_IMAGE_SIZE or int(height) < MIN_IMAGE_SIZE):
+                continue
+        except ValueError:
+            pass
+        if any(x in src.lower() for x in IMAGE_JUNK):
+            continue
+
+        imgs.append(src)
+    return imgs
+
+
+_pool = None
+_pool_lock = threading.Lock()
+_workers = max(1, (os.cpu_count() or 2) // 2)
+
+
+def configure(workers):
+    """Set the extraction pool size; takes effect when the pool is next started."""
+    global _workers
+    _workers = max(1, workers)
+
+
+def get_pool():
+    """Process-wide extraction pool, started on first use."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+            _pool = ProcessPoolExecutor(max_workers=_workers, mp_context=multiprocessing.get_context(method))
+        return _pool
+
+
+def shutdown():
+    """Stop the extraction pool's workers; the next extraction starts a new pool.
+
+    Processes that exit without running atexit handlers (multiprocessing
+    workers) must call this themselves, or exiting waits on the idle pool.
+    """
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+atexit.register(shutdown)
+
+
+def _extract_or_empty(url, content, encoding, max_chars):
+    # One malformed page must not cost the batch (and its vector) the other pages
+    try:
+        return extract_page(url, content, encoding, max_chars)
+    except Exception:
+        return "", []
+
+
+def extract_many(pages, max_chars=MAX_TEXT_CHARS):
+    """Extract (url, content, encoding) pages in the pool; results in input order.
+
+    A page that cannot be parsed comes back as ("", []).
+    """
+    global _pool
+    try:
+        futures = [get_pool().submit(_extract_or_empty, url, content, encoding, max_chars)
+                   for url, content, encoding in pages]
+        return [f.result() for f in futures]
+    except BrokenProcessPool:
+        # A crashed worker poisons the pool; start a fresh one next time and finish inline
+        with _pool_lock:
+            _pool = None
+        return [_extract_or_empty(url, content, encoding, max_chars) for url, content, encoding in pages]
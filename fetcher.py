@@ -0,0 +1,215 @@
+import asyncio
+import atexit
+import concurrent.futures
+import threading
+import time
+from dataclasses import dataclass
+from urllib.parse import urlsplit
+
+import httpx
+
+from cancel import Cancelled
+
+# ---------------------------
+# Shared page/image fetcher
+# ---------------------------
+# One pooled httpx.AsyncClient (HTTP/2, keep-alive) runs on a private event loop
+# thread. Callers on any thread use the blocking fetch()/fetch_many() wrappers;
+# with a cancel token, cancelling it aborts the requests still in flight. Other
+# HTTP clients (the LLM transport) run their coroutines on the same loop.
+
+SKIP_EXTENSIONS = ('.pdf', '.zip', '.gz', '.tar', '.exe', '.dmg', '.mp3', '.mp4', '.mov', '.avi', '.ppt', '.pptx', '.doc', '.docx', '.xls', '.xlsx')
+
+ACCEPT = {
+    'html': ('text/html', 'application/xhtml+xml', 'text/plain'),
+    'image': ('image/',),
+}
+
+
+@dataclass
+class FetchResult:
+    url: str
+    status: int
+    content_type: str
+    content: bytes
+    encoding: str = 'utf-8'
+    truncated: bool = False
+    etag: str = None
+    last_modified: str = None
+
+    @property
+    def text(self):
+        return self.content.decode(self.encoding or 'utf-8', errors='replace')
+
+
+class Fetcher:
+    def __init__(self, max_connections=32, per_host=4, timeout=5.0,
+                 max_bytes=256 * 1024, image_max_bytes=4 * 1024 * 1024):
+        self.per_host = per_host
+        self.max_bytes = max_bytes
+        self.image_max_bytes = image_max_bytes
+        self._limits = httpx.Limits(max_connections=max_connections,
+                                    max_keepalive_connections=max_connections)
+        self._timeout = httpx.Timeout(timeout)
+        self._host_sems = {}
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="pegasus-fetcher", daemon=True)
+        self._thread.start()
+        self._client = self._call(self._open())
+
+    async def _open(self):
+        return httpx.AsyncClient(
+            http2=True,
+            limits=self._limits,
+            timeout=self._timeout,
+            follow_redirects=True,
+            headers={'User-Agent': 'Mozilla/5.0 (compatible; Pegasus/4.0)'},
+        )
+
+    def _call(self, coro, timeout=None, cancel=None):
+        future = self.submit(coro)
+        if cancel is None:
+            return future.result(timeout)
+        # Cancelling the concurrent future cancels the task on the loop, closing its connections
+        with cancel.hook(future.cancel):
+            try:
+                return future.result(timeout)
+            except concurrent.futures.CancelledError:
+                raise Cancelled("Run cancelled") from None
+
+    # -----------------
+    # Public API
+    # -----------------
+    def fetch(self, url, kind='html', max_bytes=None, headers=None, cancel=None):
+        """Fetch a single URL. Returns a FetchResult, or None if skipped/failed."""
+        return self._call(self._fetch(url, kind, max_bytes, headers), cancel=cancel)
+
+    def fetch_many(self, urls, kind='html', max_bytes=None, concurrency=4, deadline=None, headers=None, tracer=None,
+                   cancel=None):
+        """Fetch URLs concurrently, results in input order.
+
+        `headers` is an optional list of per-URL request headers (e.g. cache
+        validators). Anything still in flight when `deadline` seconds pass is
+        cancelled and reported as None. With a tracer, each URL is recorded as
+        a 'fetch' span. Cancelling `cancel` aborts every request and raises
+        Cancelled.
+        """
+        urls = list(urls)
+        headers = list(headers) if headers else [None] * len(urls)
+        return self._call(self._fetch_many(urls, kind, max_bytes, concurrency, deadline, headers, tracer), cancel=cancel)
+
+    def run(self, coro, cancel=None):
+        """Run a coroutine on the fetcher's loop and wait for its result."""
+        return self._call(coro, cancel=cancel)
+
+    def submit(self, coro):
+        """Schedule a coroutine on the fetcher's loop; returns a concurrent.futures.Future."""
+        return asyncio.run_coroutine_threadsafe(coro, self._loop)
+
+    def close(self):
+        if self._loop.is_closed():
+            return
+        try:
+            self._call(self._client.aclose(), timeout=5)
+        except Exception:
+            pass
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5)
+        self._loop.close()
+
+    # -----------------
+    # Internals (event loop thread)
+    # -----------------
+    def _accepts(self, kind, content_type):
+        content_type = content_type.split(';')[0].strip().lower()
+        # Servers that omit the header are given the benefit of the doubt
+        return not content_type or content_type.startswith(ACCEPT[kind])
+
+    def _host_sem(self, url):
+        host = urlsplit(url).hostname or ''
+        sem = self._host_sems.get(host)
+        if sem is None:
+            sem = self._host_sems[host] = asyncio.Semaphore(self.per_host)
+        return sem
+
+    async def _fetch(self, url, kind, max_bytes, headers):
+        if urlsplit(url).path.lower().endswith(SKIP_EXTENSIONS):
+            return None
+        if max_bytes is None:
+            max_bytes = self.image_max_bytes if kind == 'image' else self.max_bytes
+        try:
+            async with self._host_sem(url):
+                async with self._client.stream('GET', url, headers=headers) as resp:
+                    if resp.status_code == 304:
+                        return FetchResult(str(resp.url), 304, '', b'')
+                    if resp.status_code >= 400:
+                        return None
+                    content_type = resp.headers.get('content-type', '')
+                    if not self._accepts(kind, content_type):
+                        return None
+                    buf = bytearray()
+                    truncated = False
+                    async for chunk in resp.aiter_bytes():
+                        buf += chunk
+                        if len(buf) >= max_bytes:
+                            # Stop reading; closing the stream drops the rest of the body
+                            truncated = True
+                            break
+                    return FetchResult(
+                        url=str(resp.url),
+                        status=resp.status_code,
+                        content_type=content_type,
+                        content=bytes(buf[:max_bytes]),
+                        encoding=resp.charset_encoding or 'utf-8',
+                        truncated=truncated,
+                        etag=resp.headers.get('etag'),
+                        last_modified=resp.headers.get('last-modified'),
+                    )
+        except (httpx.HTTPError, httpx.InvalidURL, UnicodeError):
+            return None
+
+    async def _fetch_many(self, urls, kind, max_bytes, concurrency, deadline, headers, tracer):
+        if not urls:
+            return []
+        gate = asyncio.Semaphore(concurrency)
+
+        async def one(url, hdrs):
+            async with gate:
+                start = time.perf_counter()
+                page = None
+                try:
+                    page = await self._fetch(url, kind, max_bytes, hdrs)
+                    return page
+                finally:
+                    if tracer:
+                        tracer.add('fetch', 'fetch', start, time.perf_counter(), url=url,
+                                   status=page.status if page else None, bytes=len(page.content) if page else 0)
+
+        tasks = [asyncio.ensure_future(one(u, h)) for u, h in zip(urls, headers)]
+        try:
+            done, pending = await asyncio.wait(tasks, timeout=deadline)
+        except asyncio.CancelledError:
+            # The caller gave up: take every request down with us
+            for t in tasks:
+                t.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+        for t in pending:
+            t.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+        return [t.result() if t in done and not t.exception() else None for t in tasks]
+
+
+_fetcher = None
+_fetcher_lock = threading.Lock()
+
+
+def get_fetcher():
+    """Process-wide shared Fetcher, created on first use."""
+    global _fetcher
+    with _fetcher_lock:
+        if _fetcher is None:
+            _fetcher = Fetcher()
+            atexit.register(_fetcher.close)
+        return _fetcher
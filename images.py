@@ -0,0 +1,128 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, Qt, pyqtSignal
+from PyQt5.QtGui import QImage
+
+from cache import data_dir
+
+# ---------------------------
+# Background image loader
+# ---------------------------
+# Downloads, decodes and scales reference images on a thread pool. QImage is
+# safe off the GUI thread; the GUI converts to QPixmap in its slot. Thumbnails
+# are cached in memory (LRU) and on disk; full-size bytes are never retained.
+
+THUMB_WIDTH = 250
+POPUP_WIDTH = 500
+
+
+class _Task(QRunnable):
+    def __init__(self, fn, *args):
+        super().__init__()
+        self.fn = fn
+        self.args = args
+
+    def run(self):
+        self.fn(*self.args)
+
+
+class ImageLoader(QObject):
+    thumb_ready = pyqtSignal(str, str, QImage)  # title, url, thumbnail
+    full_ready = pyqtSignal(str, QImage)        # url, popup-sized image (null if it failed)
+
+    def __init__(self, parent=None, workers=4, memory_items=200, disk_bytes=64 * 1024 * 1024, pool=None):
+        super().__init__(parent)
+        # Loaders of several workspaces can share one pool (and its `workers` limit)
+        if pool is None:
+            pool = QThreadPool(self)
+            pool.setMaxThreadCount(workers)
+        self.pool = pool
+        self.memory_items = memory_items
+        self.disk_bytes = disk_bytes
+        self.thumb_dir = os.path.join(data_dir(), 'thumbs')
+        os.makedirs(self.thumb_dir, exist_ok=True)
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._seen = set()
+        self._saves = 0
+
+    def request(self, title, url):
+        if url in self._seen:
+            return
+        self._seen.add(url)
+        with self._lock:
+            img = self._memory.get(url)
+            if img is not None:
+                self._memory.move_to_end(url)
+        if img is not None:
+            self.thumb_ready.emit(title, url, img)
+            return
+        self.pool.start(_Task(self._load_thumb, title, url))
+
+    def request_full(self, url):
+        self.pool.start(_Task(self._load_full, url))
+
+    # -----------------
+    # Worker threads
+    # -----------------
+    def _thumb_path(self, url):
+        return os.path.join(self.thumb_dir, hashlib.sha1(url.encode('utf-8')).hexdigest() + '.png')
+
+    def _load_thumb(self, title, url):
+        path = self._thumb_path(url)
+        img = QImage(path) if os.path.exists(path) else QImage()
+        if not img.isNull():
+            os.utime(path)  # keeps disk pruning least-recently-used
+        else:
+            img = self._download(url, THUMB_WIDTH)
+            if img.isNull():
+                return
+            img.save(path, 'PNG')
+            self._after_save()
+        with self._lock:
+            self._memory[url] = img
+            while len(self._memory) > self.memory_items:
+                self._memory.popitem(last=False)
+        try:
+            self.thumb_ready.emit(title, url, img)
+        except RuntimeError:
+            pass  # the loader's owner (a closed workspace) was deleted while this loaded
+
+    def _load_full(self, url):
+        self.full_ready.emit(url, self._download(url, POPUP_WIDTH))
+
+    def _download(self, url, width):
+        from fetcher import get_fetcher  # deferred: pulls in httpx, which the window doesn't need to start
+
+        page = get_fetcher().fetch(url, kind='image')
+        img = QImage.fromData(page.content) if page else QImage()
+        if img.isNull():
+            return img
+        return img.scaledToWidth(width, Qt.SmoothTransformation)
+
+    def _after_save(self):
+        with self._lock:
+            self._saves += 1
+            if self._saves % 20:
+                return
+        # Every few saves, trim the on-disk cache back under budget, oldest first
+        stats = []
+        for entry in os.scandir(self.thumb_dir):
+            try:
+                st = entry.stat()
+            except OSError:
+                continue
+            stats.append((st.st_mtime, st.st_size, entry.path))
+        stats.sort()
+        total = sum(size for _, size, _ in stats)
+        for _, size, path in stats:
+            if total <= self.disk_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
@@ -0,0 +1,180 @@
+import hashlib
+import json
+import os
+import queue
+import threading
+import time
+from contextlib import nullcontext
+
+from ollama import AsyncClient
+
+from cache import get_cache
+from cancel import Cancelled
+from fetcher import get_fetcher
+from retrieval import estimate_tokens
+
+# ---------------------------
+# LLM response memoization
+# ---------------------------
+# Every agent prompt is deterministic given its inputs, so completed chat
+# responses are stored on disk keyed by (model, messages, options).
+
+LLM_TTL = 30 * 24 * 3600
+CACHE_MODES = ('use', 'refresh', 'bypass')
+
+
+def chat_key(model, messages, options):
+    payload = json.dumps({'model': model, 'messages': messages, 'options': options or {}},
+                         sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class CachedClient:
+    """Drop-in wrapper around ollama.Client.chat with an on-disk response cache.
+
+    mode='use' reads and writes the cache, 'refresh' ignores cached answers but
+    stores new ones, 'bypass' leaves the cache untouched. Defaults to the
+    PEGASUS_LLM_CACHE environment variable, else 'use'.
+
+    With a tracer, every call is recorded as an 'llm' span carrying prompt and
+    response token counts. Cache hits and misses are also counted in `stats`
+    (a cache.CacheStats), if given.
+    """
+
+    def __init__(self, client, mode=None, cache=None, ttl=LLM_TTL, tracer=None, stats=None):
+        mode = mode or os.environ.get('PEGASUS_LLM_CACHE', 'use')
+        if mode not in CACHE_MODES:
+            raise ValueError(f"LLM cache mode must be one of {CACHE_MODES}, got {mode!r}")
+        self.client = client
+        self.mode = mode
+        self.cache = cache or get_cache('llm', max_bytes=128 * 1024 * 1024)
+        self.ttl = ttl
+        self.tracer = tracer
+        self.stats = stats
+
+    def _span(self, name):
+        return self.tracer.span(name, 'llm') if self.tracer else nullcontext({})
+
+    @staticmethod
+    def _usage(messages, data, cached):
+        # Servers report token counts; fall back to an estimate when they don't
+        prompt = ''.join(m.get('content', '') for m in messages or [])
+        return {
+            'prompt_tokens': data.get('prompt_eval_count') or estimate_tokens(prompt),
+            'output_tokens': data.get('eval_count') or estimate_tokens(data['message']['content']),
+            'cached': cached,
+        }
+
+    def chat(self, model, messages=None, options=None, **kwargs):
+        if kwargs.get('stream'):
+            return self.client.chat(model, messages=messages, options=options, **kwargs)
+
+        with self._span('chat') as span:
+            key = chat_key(model, messages, options)
+            if self.mode == 'use':
+                cached = self.cache.get_json('llm', key, stats=self.stats)
+                if cached is not None:
+                    span.update(self._usage(messages, cached, True))
+                    return cached
+
+            resp = self.client.chat(model, messages=messages, options=options, **kwargs)
+            # Stored as a plain dict; callers only index resp['message']['content']
+            data = resp.model_dump(mode='json', exclude_none=True) if hasattr(resp, 'model_dump') else dict(resp)
+            if self.mode != 'bypass':
+                self.cache.put_json('llm', key, data, self.ttl)
+            span.update(self._usage(messages, data, False))
+            return data
+
+    def chat_stream(self, model, messages=None, options=None, on_delta=None, **kwargs):
+        """Streaming chat. Text chunks go to on_delta as they arrive; returns the
+        assembled response in the same shape as chat().
+
+        A cache hit is delivered to on_delta as a single chunk.
+        """
+        with self._span('chat_stream') as span:
+            key = chat_key(model, messages, options)
+            if self.mode == 'use':
+                cached = self.cache.get_json('llm', key, stats=self.stats)
+                if cached is not None:
+                    if on_delta:
+                        on_delta(cached['message']['content'])
+                    span.update(self._usage(messages, cached, True))
+                    return cached
+
+            start = time.perf_counter()
+            parts = []
+            data = {}
+            for chunk in self.client.chat(model, messages=messages, options=options, stream=True, **kwargs):
+                piece = chunk['message']['content']
+                if piece:
+                    if not parts:
+                        span['first_token_ms'] = round((time.perf_counter() - start) * 1000)
+                    parts.append(piece)
+                    if on_delta:
+                        on_delta(piece)
+                if chunk.get('done'):
+                    data = chunk.model_dump(mode='json', exclude_none=True) if hasattr(chunk, 'model_dump') else dict(chunk)
+            data['message'] = {'role': 'assistant', 'content': ''.join(parts)}
+            if self.mode != 'bypass':
+                self.cache.put_json('llm', key, data, self.ttl)
+            span.update(self._usage(messages, data, False))
+            return data
+
+
+# ---------------------------
+# Cancellable transport
+# ---------------------------
+_async_clients = {}
+_async_clients_lock = threading.Lock()
+
+
+def shared_async_client(host, headers=None):
+    """One AsyncClient, and so one connection pool, per host and header set, shared by all runs."""
+    key = (host, tuple(sorted((headers or {}).items())))
+    with _async_clients_lock:
+        client = _async_clients.get(key)
+        if client is None:
+            client = _async_clients[key] = AsyncClient(host=host, headers=headers)
+        return client
+
+
+class CancellableClient:
+    """ollama.Client stand-in whose requests run on the shared fetcher loop.
+
+    Cancelling the token aborts a request mid-flight, closing its connection,
+    instead of waiting for the model to finish answering. Connections come
+    from the shared pool of shared_async_client().
+    """
+
+    def __init__(self, host=None, headers=None, cancel=None, runner=None):
+        self.cancel = cancel
+        self.runner = runner or get_fetcher()
+        self.client = shared_async_client(host, headers)
+
+    def _hook(self, future):
+        return self.cancel.hook(future.cancel) if self.cancel else nullcontext()
+
+    def chat(self, model, messages=None, options=None, stream=False, **kwargs):
+        if stream:
+            return self._stream(model, messages, options, kwargs)
+        return self.runner.run(self.client.chat(model, messages=messages, options=options, **kwargs), self.cancel)
+
+    def _stream(self, model, messages, options, kwargs):
+        chunks = queue.Queue()
+        end = object()
+
+        async def pump():
+            async for chunk in await self.client.chat(model, messages=messages, options=options, stream=True, **kwargs):
+                chunks.put(chunk)
+
+        future = self.runner.submit(pump())
+        future.add_done_callback(lambda f: chunks.put(end))
+        try:
+            with self._hook(future):
+                while (chunk := chunks.get()) is not end:
+                    yield chunk
+            if future.cancelled():
+                raise Cancelled("Run cancelled")
+            future.result()  # a failed request raises here
+        finally:
+            future.cancel()  # no-op when finished; aborts the request if the consumer stopped early
@@ -0,0 +1,98 @@
+from collections import deque
+
+from PyQt5.QtCore import QAbstractListModel, QModelIndex, Qt
+from PyQt5.QtGui import QColor, QFont, QFontMetrics
+from PyQt5.QtWidgets import QAbstractItemView, QListView, QStyle, QStyledItemDelegate
+
+# ---------------------------
+# Bounded agent log
+# ---------------------------
+# A ring buffer of (time, tag, message) rows behind a list view. Old rows fall
+# off the front once the capacity is reached, so the log never grows without
+# bound across runs; appends arrive in batches from the event bus.
+
+LOG_CAPACITY = 5000
+TAG_COLOR = QColor('#ffaa00')
+MESSAGE_COLOR = QColor('green')
+
+
+class LogModel(QAbstractListModel):
+    def __init__(self, capacity=LOG_CAPACITY, parent=None):
+        super().__init__(parent)
+        self.capacity = capacity
+        self.rows = deque(maxlen=capacity)
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        ts, tag, msg = self.rows[index.row()]
+        if role == Qt.DisplayRole:
+            return f"[{ts}] {tag}: {msg}"
+        if role == Qt.UserRole:
+            return self.rows[index.row()]
+        return None
+
+    def append_rows(self, rows):
+        rows = rows[-self.capacity:]
+        if not rows:
+            return
+        overflow = len(self.rows) + len(rows) - self.capacity
+        if overflow > 0:
+            self.beginRemoveRows(QModelIndex(), 0, overflow - 1)
+            for _ in range(overflow):
+                self.rows.popleft()
+            self.endRemoveRows()
+        start = len(self.rows)
+        self.beginInsertRows(QModelIndex(), start, start + len(rows) - 1)
+        self.rows.extend(rows)
+        self.endInsertRows()
+
+
+class LogDelegate(QStyledItemDelegate):
+    """Paints '[time] TAG:' in amber (tag bold) and the message in green."""
+
+    def paint(self, painter, option, index):
+        ts, tag, msg = index.data(Qt.UserRole)
+        painter.save()
+        if option.state & QStyle.State_Selected:
+            painter.fillRect(option.rect, option.palette.highlight())
+        rect = option.rect.adjusted(4, 0, -4, 0)
+        flags = Qt.AlignLeft | Qt.AlignVCenter
+
+        bold = QFont(option.font)
+        bold.setBold(True)
+        parts = ((f"[{ts}] ", option.font, TAG_COLOR), (f"{tag}: ", bold, TAG_COLOR), (msg, option.font, MESSAGE_COLOR))
+        for text, font, color in parts:
+            painter.setFont(font)
+            painter.setPen(color)
+            metrics = QFontMetrics(font)
+            painter.drawText(rect, flags, metrics.elidedText(text, Qt.ElideRight, rect.width()))
+            rect.setLeft(rect.left() + metrics.horizontalAdvance(text))
+            if rect.width() <= 0:
+                break
+        painter.restore()
+
+
+class LogView(QListView):
+    def __init__(self, model, parent=None):
+        super().__init__(parent)
+        self.setModel(model)
+        self.setItemDelegate(LogDelegate(self))
+        self.setUniformItemSizes(True)  # lets the view skip measuring every row
+        self.setSelectionMode(QAbstractItemView.ExtendedSelection)
+        self.setVerticalScrollMode(QAbstractItemView.ScrollPerPixel)
+        model.rowsAboutToBeInserted.connect(self._remember_tail)
+        model.rowsInserted.connect(self._follow_tail)
+        self._at_tail = True
+
+    def _remember_tail(self, *args):
+        bar = self.verticalScrollBar()
+        self._at_tail = bar.value() >= bar.maximum() - 2
+
+    def _follow_tail(self, *args):
+        # Only follow new lines if the user hasn't scrolled up to read
+        if self._at_tail:
+            self.scrollToBottom()
@@ -0,0 +1,168 @@
+from collections import OrderedDict
+
+from PyQt5.QtWidgets import QDialog, QLabel, QPushButton, QSizePolicy, QTabWidget, QVBoxLayout, QWidget
+
+# ---------------------------
+# Analytical map cards
+# ---------------------------
+# Cards keep only their HTML. A web view is attached when a card's tab is first
+# shown, taken from a small pool; the least recently shown card gives its view
+# up when the pool is exhausted. Off-screen views are frozen, and the popup
+# borrows the card's own view instead of starting another renderer.
+# QtWebEngine itself is imported when the first view is needed, not at startup.
+
+MAX_LIVE_VIEWS = 2
+
+
+def set_lifecycle(view, state):
+    """Freeze or wake a page. No-op on Qt < 5.14, which lacks lifecycle states."""
+    from PyQt5.QtWebEngineWidgets import QWebEnginePage
+
+    page = view.page()
+    if hasattr(page, 'setLifecycleState'):
+        page.setLifecycleState(getattr(QWebEnginePage.LifecycleState, state))
+
+
+class ViewPool:
+    """At most `size` web views, lent to cards; the least recently shown card is evicted."""
+
+    def __init__(self, size=MAX_LIVE_VIEWS):
+        self.size = size
+        self.lent = OrderedDict()  # card -> view, least recently shown first
+        self.free = []
+
+    def acquire(self, card):
+        """Return (view, fresh); fresh views still need the card's HTML loaded."""
+        view = self.lent.pop(card, None)
+        fresh = view is None
+        if fresh:
+            if self.free:
+                view = self.free.pop()
+            elif len(self.lent) >= self.size:
+                old, view = self.lent.popitem(last=False)
+                old.view = None
+            else:
+                from PyQt5.QtWebEngineWidgets import QWebEngineView
+
+                view = QWebEngineView()
+                view.setMinimumHeight(500)
+                view.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
+        self.lent[card] = view
+        return view, fresh
+
+    def release(self, cards):
+        """Take back the views lent to cards (e.g. before they are deleted)."""
+        for card in cards:
+            view = self.lent.pop(card, None)
+            if view is None:
+                continue
+            card.view = None
+            view.hide()
+            view.setParent(None)  # survives its card being deleted
+            self.free.append(view)
+
+
+class MapCard(QWidget):
+    def __init__(self, title, html, on_popup):
+        super().__init__()
+        self.title = title
+        self.html = html
+        self.view = None
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(20, 20, 20, 20)
+        layout.setSpacing(10)
+
+        label = QLabel(title)
+        label.setWordWrap(True)
+        label.setStyleSheet("font-weight: bold; font-size: 16px;")
+        layout.addWidget(label)
+
+        # Shown while the view is lent to the popup
+        self.placeholder = QLabel("Open in popup window.")
+        self.placeholder.hide()
+        layout.addWidget(self.placeholder)
+        self.slot = QVBoxLayout()
+        layout.addLayout(self.slot)
+
+        popup_btn = QPushButton("Open in Popup")
+        popup_btn.clicked.connect(lambda: on_popup(self))
+        layout.addWidget(popup_btn)
+        layout.addStretch(1)
+
+    def attach(self, view, load):
+        self.view = view
+        if load:
+            view.setHtml(self.html)
+        set_lifecycle(view, 'Active')
+        self.slot.addWidget(view)
+        view.show()
+
+    def suspend(self):
+        if self.view is not None:
+            self.view.hide()
+            set_lifecycle(self.view, 'Frozen')
+
+
+class MapDeck(QTabWidget):
+    """Tab widget of MapCards sharing a ViewPool; only the current tab renders.
+
+    Pass `pool` to share one ViewPool between several decks.
+    """
+
+    def __init__(self, pool_size=MAX_LIVE_VIEWS, parent=None, pool=None):
+        super().__init__(parent)
+        self.pool = pool or ViewPool(pool_size)
+        self.current_card = None
+        self.currentChanged.connect(self._on_current)
+
+    def add_map(self, title, html):
+        self.addTab(MapCard(title, html, self.popup), title)
+
+    def clear_maps(self):
+        self.pool.release([self.widget(i) for i in range(self.count())])
+        self.current_card = None
+        self.blockSignals(True)
+        while self.count():
+            card = self.widget(0)
+            self.removeTab(0)
+            card.deleteLater()
+        self.blockSignals(False)
+
+    def _on_current(self, index):
+        card = self.widget(index)
+        if card is self.current_card:
+            return
+        if self.current_card is not None:
+            self.current_card.suspend()
+        self.current_card = card
+        if card is not None and self.isVisible():
+            self._show(card)
+
+    def _show(self, card):
+        view, fresh = self.pool.acquire(card)
+        card.attach(view, load=fresh)
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        if self.current_card is not None:
+            self._show(self.current_card)
+
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        if self.current_card is not None:
+            self.current_card.suspend()
+
+    def popup(self, card):
+        dlg = QDialog(self.window())
+        dlg.setWindowTitle(card.title)
+        dlg.resize(1000, 700)
+        layout = QVBoxLayout(dlg)
+        if card.view is None:
+            self._show(card)
+        view = card.view
+        layout.addWidget(view)
+        card.placeholder.show()
+        dlg.exec_()  # modal, so the card cannot lose its view meanwhile
+        card.placeholder.hide()
+        card.slot.addWidget(view)
+        dlg.deleteLater()
@@ -1,303 +1,197 @@
-import sys, re, ast, requests, markdown
+import importlib, itertools, sys, threading
 from datetime import datetime
-from ollama import Client
-from ddgs import DDGS
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QPushButton,
     QLineEdit, QTextEdit, QLabel, QProgressBar, QFrame, QSplitter, QTabWidget,
-    QTreeWidget, QTreeWidgetItem, QFileDialog, QMessageBox, QScrollArea, QSizePolicy, QDialog
+    QTreeWidget, QTreeWidgetItem, QFileDialog, QMessageBox, QScrollArea, QDialog,
+    QStackedWidget
 )
-from PyQt5.QtCore import Qt, QThread, pyqtSignal
-from PyQt5.QtGui import QColor, QPixmap
-from PyQt5.QtWebEngineWidgets import QWebEngineView
-import plotly.graph_objects as go
-from bs4 import BeautifulSoup
-from urllib.parse import urljoin
-import json
-import os
+from PyQt5.QtCore import QCoreApplication, Qt, QThread, QThreadPool, QTimer, pyqtSignal
+from PyQt5.QtGui import QColor, QPixmap, QTextCursor, QTextDocument, QTextDocumentFragment
+
+from cancel import Cancelled
+from eventbus import EventBus
+from images import ImageLoader
+from logview import LogModel, LogView
+from maps import MapDeck, ViewPool
+from runstore import get_run_store
+from tracing import traced
+
+STREAM_FLUSH_MS = 100     # GUI repaint interval for streamed text
+HUD_REFRESH_MS = 500      # timing summary refresh in the HUD ticker
+PRELOAD_DELAY_MS = 500    # start background imports once the window has painted
+MAX_PARALLEL_JOBS = 3     # queued targets beyond this wait for a running one to finish
+IMAGE_WORKERS = 4         # image download/decode threads, shared by all workspaces
+CHART_NAMES = ("Market", "PESTLE", "Moat")
+
+# Imported on first use, or ahead of time on a background thread once the window
+# is up; none of them is needed to show the terminal.
+PRELOAD_MODULES = ("engine", "fetcher", "markdown", "plotly.graph_objects")
+
+_run_numbers = itertools.count(1)
+
+REPORT_CSS = """
+    body { 
+        font-family: 'Segoe UI', sans-serif; 
+        color: #e0e0e0; 
+        background-color: #0b0e14; 
+        line-height: 1.6;
+    }
+    h1 { color: #ffffff; text-align: center; margin-bottom: 30px; }
+    h2 { 
+        color: #ffaa00; 
+        text-shadow: 0 0 12px rgba(255, 170, 0, 0.4); 
+        border-bottom: 1px solid rgba(255, 170, 0, 0.2);
+        padding-bottom: 5px;
+        margin-top: 30px;
+    }
+    h3 { color: #58a6ff; }
+    strong { color: #ffffff; font-weight: bold; }
+    ul { margin-left: 20px; color: #b0b0b0; }
+    li { margin-bottom: 8px; }
+    table { border-collapse: collapse; width: 100%; margin: 20px 0; background: rgba(255,255,255,0.03); }
+    th { background: rgba(255,170,0,0.1); color: #ffaa00; padding: 10px; text-align: left; }
+    td { border: 1px solid rgba(255,255,255,0.1); padding: 8px; }
+    code { background: #161b22; color: #ff7b72; padding: 3px 6px; border-radius: 4px; }
+"""
+
+
+def md_to_html(text):
+    import markdown
+
+    return markdown.markdown(text, extensions=['fenced_code', 'tables'])
+
+
+def preload_modules():
+    """Import PRELOAD_MODULES on a daemon thread so the first run doesn't pay for them."""
+    def load():
+        for name in PRELOAD_MODULES:
+            try:
+                importlib.import_module(name)
+            except Exception:
+                pass  # the real import on first use reports it
+    threading.Thread(target=load, name="preload", daemon=True).start()
+
 
 # ---------------------------
 # Worker: Recursive Sectional Agent
 # ---------------------------
 class RecursiveSectionalAgent(QThread):
-    log_sig = pyqtSignal(str, str)
-    query_sig = pyqtSignal(str)
-    url_sig = pyqtSignal(str, str)
-    vector_intel_sig = pyqtSignal(str, str)
-    master_section_sig = pyqtSignal(str, str)
-    analytical_sig = pyqtSignal(str, str)
-    chart_sig = pyqtSignal(str, object)
-    image_sig = pyqtSignal(str, str)
-    progress_sig = pyqtSignal(int)
-    finished_sig = pyqtSignal()
-
-    def __init__(self, target):
+    """QThread front-end for ResearchEngine: engine events become Qt signals.
+
+    Every signal carries the agent's run number first, so receivers can drop
+    late events from a run they have moved on from. stop() cancels the run.
+    """
+    log_sig = pyqtSignal(int, str, str)
+    query_sig = pyqtSignal(int, str)
+    url_sig = pyqtSignal(int, str, str)
+    vector_intel_sig = pyqtSignal(int, str, str)
+    vector_intel_delta_sig = pyqtSignal(int, str, str)    # partial summary text as it streams
+    master_section_sig = pyqtSignal(int, str, str)
+    master_section_delta_sig = pyqtSignal(int, str, str)  # partial section text as it streams
+    analytical_sig = pyqtSignal(int, str, str)
+    chart_sig = pyqtSignal(int, str, str)                 # chart name, plotly figure JSON
+    image_sig = pyqtSignal(int, str, str)
+    progress_sig = pyqtSignal(int, int)
+    finished_sig = pyqtSignal(int)
+
+    def __init__(self, target, **options):
         super().__init__()
+        from engine import ResearchEngine
+
         self.target = target
-        self.client = Client(
-            host='https://ollama.com',
-            headers={'Authorization': f"Bearer {os.environ.get('OLLAMA_API_KEY')}"}
-        )
-        self.model = 'gpt-oss:120b'
-        self.vector_summaries = []
+        self.run_no = next(_run_numbers)
+        self.engine = ResearchEngine(target, on_event=self.on_event, **options)
 
-    def run(self):
-        try:
-            self.log_sig.emit("SYSTEM", f"AGENT DEPLOYED: {self.target}")
-
-            # --- Phase 1: Generate Research Vectors ---
-            v_prompt = (
-                f"Generate a Python list of exactly 7 distinct market research queries "
-                f"for deep due diligence on: {self.target}. Return ONLY the Python list."
-            )
-            resp = self.client.chat(self.model, messages=[{'role': 'user', 'content': v_prompt}])
-            try:
-                match = re.search(r'\[.*\]', resp['message']['content'], re.DOTALL)
-                queries = ast.literal_eval(match.group(0)) if match else [self.target]
-            except:
-                queries = [self.target + " analysis", self.target + " competitors"]
-
-            # --- Phase 2: Gather Vector Intelligence ---
-            for idx, q in enumerate(queries):
-                self.query_sig.emit(q)
-                self.log_sig.emit("AI_THOUGHT", f"Mining Vector: {q}")
-
-                raw_texts = []
-                image_links = []
-                try:
-                    results = DDGS().text(q, max_results=3)
-                    for r in results:
-                        link = r['href']
-                        self.url_sig.emit(q, link)
-                        
-                        try:
-                            data = requests.get(link, timeout=5).text
-                        except requests.RequestException:
-                            continue
-                        text = re.sub('<[^<]+?>', '', data)
-                        if text:
-                            raw_texts.append(text[:2000])
-                        
-                        soup = BeautifulSoup(data, 'html.parser')
-                        main_content = soup.find('main') or soup.find('article') or soup
-                        
-                        imgs = []
-                        for img in main_content.find_all('img'):
-                            src = img.get('src')
-                            if not src:
-                                continue
-                            
-                            src = urljoin(link, src)  
-                            width = img.get('width')
-                            height = img.get('height')
-                            try:
-                                if width and height and (int(width) < 150 or int(height) < 150):
-                                    continue
-                            except ValueError:
-                                pass  
-                            if any(x in src.lower() for x in ['/logo', '/icon', '/ads/', '/sprite']):
-                                continue
-                            
-                            imgs.append(src)
-                        
-                        image_links.extend(imgs)                   
-                except: pass
-
-                if raw_texts:
-                    sub_prompt = f"Summarize verified intelligence for: {q}.\n" + "\n".join(raw_texts)
-                    sub_intel = self.client.chat(self.model, messages=[{'role':'user','content':sub_prompt}])
-                    intel_txt = sub_intel['message']['content']
-
-                    for img in image_links:
-                        self.image_sig.emit(q, img)
-
-                    self.vector_intel_sig.emit(q, intel_txt)
-                    self.vector_summaries.append(f"{q}: {intel_txt}")
-                    
-                    self.log_sig.emit("SYSTEM PROCESSING", "Working on the analytical map...")
-
-                    analytical_prompt = (
-                        "Now for the content generate a CLEAR AND BEAUTIFUL flow diagram or infographics in core html css only NO MARKDOWN just CORE RESPONSIVE HTML CSS in syntax <html><head>...<style>...</style></head><body>...</body></html>"
-                        f"{q}\n\n"
-                        + "\n".join(intel_txt))
-                    analytical_intel = self.client.chat(self.model, messages=[{'role':'user','content':analytical_prompt}])
-                    self.analytical_sig.emit(q, analytical_intel['message']['content'])  # first sentence as summary
-
-                self.progress_sig.emit(int(((idx+1)/len(queries))*50))
-
-            # --- Phase 3: Master Section ---
-            report_sections = [
-                ("Executive Summary","High-level overview"),
-                ("SWOT Analysis","Strengths, Weaknesses, Opportunities, Threats"),
-                ("PESTLE Analysis","Political, Economic, Social, Technological, Legal, Environmental"),
-                ("Porter's Five Forces","Industry competitiveness"),
-                ("Moat & Defensibility","Long-term advantage"),
-                ("Competitive Landscape","Market share & competitors"),
-                ("Strategic Outlook","Projections 2026-2030")
-            ]
-            context_for_master = "\n\n".join(self.vector_summaries)
-            for i,(title,instruction) in enumerate(report_sections):
-                self.log_sig.emit("AI", f"Streaming Master Section: {title}")
-                section_prompt = (
-                    f"Write '{title}' section for {self.target} using ONLY below research data:\n"
-                    f"{context_for_master[:10000]}"
-                )
-                section_resp = self.client.chat(self.model, messages=[{'role':'user','content':section_prompt}])
-                self.master_section_sig.emit(title, section_resp['message']['content'])
-                self.progress_sig.emit(48+int(((i+1)/len(report_sections))*48))
-
-            # --- Charts ---
-            self.log_sig.emit("System", "Generating market projection data...")
-
-            chart_prompt = (
-    "From the following research data, estimate plausible numerical data for plotting:\n"
-    "- market_variation: 5–8 time periods (e.g. years or quarters) with market-related values (e.g. market size in $B, growth rate, users, etc.)\n"
-    "- pestle scores\n"
-    "- moat/defensibility parameters\n\n"
-    "Return STRICT JSON only in this exact format:\n"
-    "{\n"
-    '  "market_variation": {\n'
-    '    "labels": ["2020", "2021", "2022", "2023", "2024", "2025"],\n'
-    '    "values": [number, number, number, number, number, number]\n'
-    '  },\n'
-    '  "pestle": {\n'
-    '    "political": number,\n'
-    '    "environmental": number,\n'
-    '    "social": number,\n'
-    '    "technological": number,\n'
-    '    "legal": number,\n'
-    '    "economic": number\n'
-    '  },\n'
-    '  "moat": {\n'
-    '    "parameter as needed along with value in number"\n'
-    '  }\n'
-    "}\n\n"
-    "Use only the provided research context. Do not include commentary.\n\n"
-    f"RESEARCH DATA:\n{context_for_master[:12000]}"
-)
+    def on_event(self, kind, *args):
+        if kind == 'chart':
+            # Serialise here, off the GUI thread; the chart host only needs JSON
+            args = (args[0], args[1].to_json())
+        getattr(self, f"{kind}_sig").emit(self.run_no, *args)
 
-            chart_resp = self.client.chat(self.model, messages=[{'role': 'user', 'content': chart_prompt}])
-            json_match = re.search(r"\{.*\}", chart_resp["message"]["content"], re.DOTALL)
-
-            if json_match:
-                chart_data = json.loads(json_match.group(0))
-
-                mv = chart_data.get('market_variation', {})
-                if 'labels' in mv and 'values' in mv:
-                    fig2 = go.Figure()
-                    fig2.add_trace(go.Scatter(
-                        x=mv['labels'],
-                        y=mv['values'],
-                        mode='lines+markers',
-                        name='Market Trend',
-                        line=dict(color='#1f77b4', width=2.5),
-                        marker=dict(size=8)
-                    ))
-                    fig2.update_layout(
-                        title="Market Variation Over Time",
-                        xaxis_title="Period",
-                        yaxis_title="Value ($B / mln users / % growth …)",
-                        showlegend=True,
-                        autosize=True,
-                        template="plotly_white"
-                    )
-                    self.chart_sig.emit("Market", fig2)
-                else:
-                    self.log_sig.emit("WARN", "market_variation data missing or invalid")
-
-                
-                pestle = chart_data.get('pestle', {})
-                if pestle:
-                    fig3 = go.Figure()
-                    fig3.add_trace(go.Scatterpolar(
-                        r=list(pestle.values()),
-                        theta=list(pestle.keys()),
-                        fill='toself',
-                        name="PESTLE",
-                        fillcolor='rgba(85, 255, 85, 0.25)'
-                    ))
-                    fig3.update_layout(
-                        title="PESTLE Analysis",
-                        polar=dict(radialaxis=dict(visible=True, range=[0, 10])),
-                        showlegend=True,
-                        autosize=True
-                    )
-                    self.chart_sig.emit("PESTLE", fig3)
-
-                
-                moat = chart_data.get('moat', {})
-                if moat:
-                    fig4 = go.Figure([go.Bar(
-                        x=list(moat.keys()),
-                        y=list(moat.values()),
-                        marker_color="#ffaa00",
-                        text=[f"{v}%" for v in moat.values()],
-                        textposition='auto'
-                    )])
-                    fig4.update_layout(
-                        title="Moat & Defensibility",
-                        yaxis=dict(range=[0, 100], title="Strength (%)"),
-                        xaxis_title="Moat Components",
-                        autosize=True,
-                        bargap=0.3
-                    )
-                    self.chart_sig.emit("Moat", fig4)
+    def stop(self):
+        """Cancel the run; the thread finishes as soon as in-flight work is aborted."""
+        self.engine.stop()
 
-            else:
-                self.log_sig.emit("WARN", "No valid JSON found in chart response")
+    def run(self):
+        self.engine.run()
 
-            self.progress_sig.emit(100)
-            self.finished_sig.emit()
-            self.log_sig.emit("SUCCESS", "All sections, charts, and analytical maps generated.")
 
-        except Exception as e:
-            self.log_sig.emit("ERROR", f"Agent Error: {str(e)}")
+# ---------------------------
+# UI: Run History
+# ---------------------------
+class RunHistoryDialog(QDialog):
+    """Stored runs, newest first. Double-click or OPEN to load one."""
+    def __init__(self, store, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Run History")
+        self.resize(800, 400)
+        self.store = store
+        self.selected = None
+        layout = QVBoxLayout(self)
+        self.runs = QTreeWidget()
+        self.runs.setHeaderLabels(["Started", "Target", "Status", "Run"])
+        self.runs.setRootIsDecorated(False)
+        for run in store.list_runs():
+            started = datetime.fromtimestamp(run['created']).strftime("%Y-%m-%d %H:%M")
+            item = QTreeWidgetItem([started, run['target'], run['status'], run['id']])
+            item.setData(0, Qt.UserRole, run)
+            if run['error']:
+                item.setToolTip(2, run['error'])
+            self.runs.addTopLevelItem(item)
+        self.runs.itemDoubleClicked.connect(lambda item, col: self.open_selected())
+        layout.addWidget(self.runs)
+
+        buttons = QHBoxLayout()
+        btn_open = QPushButton("OPEN")
+        btn_open.clicked.connect(self.open_selected)
+        btn_delete = QPushButton("DELETE")
+        btn_delete.clicked.connect(self.delete_selected)
+        buttons.addStretch(1)
+        buttons.addWidget(btn_delete)
+        buttons.addWidget(btn_open)
+        layout.addLayout(buttons)
+
+    def open_selected(self):
+        item = self.runs.currentItem()
+        if item:
+            self.selected = item.data(0, Qt.UserRole)
+            self.accept()
+
+    def delete_selected(self):
+        item = self.runs.currentItem()
+        if item:
+            self.store.delete_run(item.data(0, Qt.UserRole)['id'])
+            self.runs.takeTopLevelItem(self.runs.indexOfTopLevelItem(item))
 
 
 # ---------------------------
-# UI: Pegasus Terminal
+# UI: Job Workspace
 # ---------------------------
-class PegasusTerminal(QMainWindow):
-    def __init__(self):
-        super().__init__()
-        self.setWindowTitle("Pegasus Apex v4 | Market Intelligence Terminal")
-        self.resize(1900, 1000)
+class Workspace(QWidget):
+    """One job's results: vector tree, insights, master report, maps, charts, images."""
+    def __init__(self, target, image_pool=None, view_pool=None, parent=None):
+        super().__init__(parent)
+        self.target = target
         self.query_nodes = {}
         self.full_report_accumulator = ""
-        self.init_ui()
-        self.apply_styles()
-
-    def init_ui(self):
-        central = QWidget()
-        self.setCentralWidget(central)
-        main_layout = QVBoxLayout(central)
-
-        # HUD
-        hud = QFrame()
-        hud.setFixedHeight(40)
-        hud_layout = QHBoxLayout(hud)
-        self.ticker = QLabel("PEGASUS APEX: INTERACTIVE TERMINAL | RECURSIVE AGENT READY")
-        self.ticker.setStyleSheet("color: #ffaa00; font-family: 'Consolas'; font-weight: bold; font-size: 11px;")
-        hud_layout.addWidget(self.ticker)
-        main_layout.addWidget(hud)
-
-        # Command panel
-        cmd_panel = QFrame()
-        cmd_panel.setFixedHeight(60)
-        cmd_layout = QHBoxLayout(cmd_panel)
-        self.input_subject = QLineEdit()
-        self.input_subject.setPlaceholderText("Enter subject for analysis...")
-        self.btn_run = QPushButton("DEPLOY AGENT")
-        self.btn_run.clicked.connect(self.start_analysis)
-        self.btn_save = QPushButton("DOWNLOAD REPORT")
-        self.btn_save.setEnabled(False)
-        self.btn_save.clicked.connect(self.save_report)
-        cmd_layout.addWidget(self.input_subject)
-        cmd_layout.addWidget(self.btn_run)
-        cmd_layout.addWidget(self.btn_save)
-        main_layout.addWidget(cmd_panel)
-
-        # Splitter layout
+        self.live_vectors = {}       # vector -> partial summary while streaming
+        self.live_section = None     # [title, partial text] of the section being streamed
+        self.live_starts = {}        # view -> document position where its streaming tail begins
+        self.section_html = {}       # section title -> rendered HTML fragment
+        self.stream_dirty = set()
+        self.stream_timer = QTimer(self)
+        self.stream_timer.setSingleShot(True)
+        self.stream_timer.setInterval(STREAM_FLUSH_MS)
+        self.stream_timer.timeout.connect(self.flush_streams)
+        self.image_loader = ImageLoader(self, pool=image_pool)
+        self.image_loader.thumb_ready.connect(self.on_thumb_ready)
+        self.tracer = None           # the job's tracer; render slots record spans on it
+        self.init_ui(view_pool)
+
+    def init_ui(self, view_pool):
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
         splitter = QSplitter(Qt.Horizontal)
 
         # Left: Tree
@@ -313,6 +207,8 @@ class PegasusTerminal(QMainWindow):
         self.insight_view.setReadOnly(True)
         self.report_view = QTextEdit()
         self.report_view.setReadOnly(True)
+        # Styles live on the document so sections can be appended as bare fragments
+        self.report_view.document().setDefaultStyleSheet(REPORT_CSS)
         self.center_tabs.addTab(self.insight_view, "Vector Insights")
         self.center_tabs.addTab(self.report_view, "Master Report")
         center_layout.addWidget(self.center_tabs)
@@ -324,17 +220,17 @@ class PegasusTerminal(QMainWindow):
         self.right_tabs = QTabWidget()
 
         # analytical Map
-        self.kmap_layout = QTabWidget()
+        self.kmap_layout = MapDeck(pool=view_pool)
         self.right_tabs.addTab(self.kmap_layout, "Analytical Map")
 
-        # Charts
+        # Charts: web views are created when the tab is first opened
         self.charts_tabs = QTabWidget()
         self.chart_views = {}
-        for c in ["Market","PESTLE","Moat"]:
-            view = QWebEngineView()
-            self.chart_views[c] = view
-            self.charts_tabs.addTab(view, c)
+        self.chart_figures = {}      # chart name -> latest figure JSON
+        for c in CHART_NAMES:
+            self.charts_tabs.addTab(QWidget(), c)
         self.right_tabs.addTab(self.charts_tabs, "Charts")
+        self.right_tabs.currentChanged.connect(self.on_right_tab)
 
         # Images
         self.image_scroll = QScrollArea()
@@ -350,87 +246,56 @@ class PegasusTerminal(QMainWindow):
         splitter.setStretchFactor(0,1)
         splitter.setStretchFactor(1,3)
         splitter.setStretchFactor(2,2)
-        main_layout.addWidget(splitter)
-
-        # Progress & Logs
-        self.prog = QProgressBar()
-        self.prog.hide()
-        main_layout.addWidget(self.prog)
-        self.log_box = QTextEdit()
-        self.log_box.setReadOnly(True)
-        self.log_box.setFixedHeight(100)
-        main_layout.addWidget(self.log_box)
-
-    def apply_styles(self):
-        self.setStyleSheet("""
-            QWidget { background-color: #0b0e14; color: #d1d5db; font-family: 'Consolas'; }
-            QLineEdit { background:#0b0e14; border:1px solid #30363d; padding:5px; color:white; border-radius:4px; }
-            QPushButton { background:#238636; color:white; font-weight:bold; padding:5px; border-radius:4px; }
-            QPushButton:hover { background:#2ea043; }
-            QPushButton:disabled { background:#1a1f26; color:#444; }
-            QTabWidget::pane { border:1px solid #30363d; }
-            QTreeWidget { background:#0b0e14; border:1px solid #30363d; }
-            QProgressBar { border:1px solid #30363d; background:#000; height:10px; }
-            QProgressBar::chunk { background:#ffaa00; }
-            QTextEdit { background:#0b0e14; color:#d1d5db; }
-        """)
+        layout.addWidget(splitter)
+
+    def release(self):
+        """Give back shared resources before the workspace is deleted."""
+        self.kmap_layout.clear_maps()
+
+    @traced('render')
+    def add_query_nodes(self, queries):
+        self.tree.setUpdatesEnabled(False)
+        for q in queries:
+            parent = QTreeWidgetItem(self.tree)
+            parent.setText(0,f"VEC: {q.upper()}")
+            parent.setForeground(0,QColor("#ffaa00"))
+            self.query_nodes[q] = parent
+            parent.setExpanded(True)
+        self.tree.setUpdatesEnabled(True)
+
+    @traced('render')
+    def add_url_nodes(self, pairs):
+        # Children are built detached and attached per vector in one call
+        children = {}
+        for q, url in pairs:
+            if q in self.query_nodes:
+                child = QTreeWidgetItem()
+                child.setText(0,url)
+                child.setForeground(0,QColor("#58a6ff"))
+                children.setdefault(q, []).append(child)
+        self.tree.setUpdatesEnabled(False)
+        for q, items in children.items():
+            self.query_nodes[q].addChildren(items)
+        self.tree.setUpdatesEnabled(True)
+
+    @traced('render')
+    def stream_vector_insight(self, header, content):
+        # Final summary replaces the vector's live (streaming) block
+        self.live_vectors.pop(header, None)
+        self.set_live_tail(self.insight_view, "")
+        self.append_html(self.insight_view, self.vector_block_html(header, content))
+        self.render_live_vectors()
 
-    # -----------------
-    # Event Handlers
-    # -----------------
-    def start_analysis(self):
-        target = self.input_subject.text()
-        if not target: return
-        self.tree.clear()
-        self.insight_view.clear()
-        self.report_view.clear()
-        self.full_report_accumulator = ""
-        self.btn_run.setEnabled(False)
-        self.btn_save.setEnabled(False)
-        self.prog.show()
-
-        # Clear previous analytical map, images
-        for i in reversed(range(self.kmap_layout.count())):
-            self.kmap_layout.itemAt(i).widget().deleteLater()
-        for i in reversed(range(self.image_layout.count())):
-            self.image_layout.itemAt(i).widget().deleteLater()
-
-        self.worker = RecursiveSectionalAgent(target)
-        self.worker.log_sig.connect(self.log)
-        self.worker.query_sig.connect(self.add_query_node)
-        self.worker.url_sig.connect(self.add_url_node)
-        self.worker.vector_intel_sig.connect(self.stream_vector_insight)
-        self.worker.master_section_sig.connect(self.stream_master_section)
-        self.worker.analytical_sig.connect(self.add_analytical_card)
-        self.worker.chart_sig.connect(self.display_chart)
-        self.worker.image_sig.connect(self.add_image)
-        self.worker.progress_sig.connect(self.prog.setValue)
-        self.worker.finished_sig.connect(self.on_complete)
-        self.worker.start()
-
-    def add_query_node(self,q):
-        parent = QTreeWidgetItem(self.tree)
-        parent.setText(0,f"VEC: {q.upper()}")
-        parent.setForeground(0,QColor("#ffaa00"))
-        self.query_nodes[q] = parent
-        self.tree.expandItem(parent)
-
-    def add_url_node(self,q,url):
-        if q in self.query_nodes:
-            child = QTreeWidgetItem(self.query_nodes[q])
-            child.setText(0,url)
-            child.setForeground(0,QColor("#58a6ff"))
+    def vector_block_html(self, header, content, live=False):
+        html_content = md_to_html(content)
 
-    def stream_vector_insight(self, header, content):
-        html_content = markdown.markdown(content, extensions=['fenced_code', 'tables'])
-        
         vector_style = """
         <style>
             body { font-family: 'Segoe UI', sans-serif; color: #d1d5db; background-color: transparent; }
-            .vector-header { 
-                color: #ffaa00; 
-                font-size: 14px; 
-                font-weight: bold; 
+            .vector-header {
+                color: #ffaa00;
+                font-size: 14px;
+                font-weight: bold;
                 text-transform: uppercase;
                 letter-spacing: 1px;
                 border-left: 3px solid #ffaa00;
@@ -441,142 +306,533 @@ class PegasusTerminal(QMainWindow):
             hr { border: 0; border-top: 1px solid rgba(255, 255, 255, 0.1); margin: 20px 0; }
         </style>
         """
-        
+
+        status = " (STREAMING...)" if live else ""
         styled_block = f"""
         {vector_style}
-        <div class="vector-header">RECURSIVE VECTOR: {header.upper()}</div>
+        <div class="vector-header">RECURSIVE VECTOR: {header.upper()}{status}</div>
         <div class="vector-content">{html_content}</div>
         <hr>
         """
-        self.insight_view.append(styled_block)
+        return styled_block
 
+    @traced('render')
     def stream_master_section(self, title, content):
         self.center_tabs.setCurrentIndex(1)
-        self.full_report_accumulator += f"## {title}\n\n{content}\n\n"
-        html_body = markdown.markdown(self.full_report_accumulator, extensions=['fenced_code', 'tables'])
-        
-        master_style = """
-        <style>
-            body { 
-                font-family: 'Segoe UI', sans-serif; 
-                color: #e0e0e0; 
-                background-color: #0b0e14; 
-                line-height: 1.6;
-            }
-            h1 { color: #ffffff; text-align: center; margin-bottom: 30px; }
-            h2 { 
-                color: #ffaa00; 
-                text-shadow: 0 0 12px rgba(255, 170, 0, 0.4); 
-                border-bottom: 1px solid rgba(255, 170, 0, 0.2);
-                padding-bottom: 5px;
-                margin-top: 30px;
-            }
-            h3 { color: #58a6ff; }
-            strong { color: #ffffff; font-weight: bold; }
-            ul { margin-left: 20px; color: #b0b0b0; }
-            li { margin-bottom: 8px; }
-            table { border-collapse: collapse; width: 100%; margin: 20px 0; background: rgba(255,255,255,0.03); }
-            th { background: rgba(255,170,0,0.1); color: #ffaa00; padding: 10px; text-align: left; }
-            td { border: 1px solid rgba(255,255,255,0.1); padding: 8px; }
-            code { background: #161b22; color: #ff7b72; padding: 3px 6px; border-radius: 4px; }
-        </style>
-        """
-        self.report_view.setHtml(master_style + html_body)
+        section_md = f"## {title}\n\n{content}\n\n"
+        self.full_report_accumulator += section_md
+        # Only the new section is converted; its fragment is kept for the HTML export
+        self.section_html[title] = md_to_html(section_md)
+        if self.live_section and self.live_section[0] == title:
+            self.live_section = None
+        self.set_live_tail(self.report_view, "")
+        self.append_html(self.report_view, self.section_html[title])
+        self.render_live_section()
+
+    def render_live_section(self):
+        html = ""
+        if self.live_section:
+            title, partial = self.live_section
+            html = md_to_html(f"## {title}\n\n{partial}")
+        self.set_live_tail(self.report_view, html)
 
+    # -----------------
+    # Streaming (partial text, throttled)
+    # -----------------
+    def on_vector_delta(self, q, delta):
+        self.live_vectors[q] = self.live_vectors.get(q, "") + delta
+        self.schedule_stream_flush('vectors')
+
+    def on_section_delta(self, title, delta):
+        if not self.live_section or self.live_section[0] != title:
+            self.center_tabs.setCurrentIndex(1)
+            self.live_section = [title, ""]
+        self.live_section[1] += delta
+        self.schedule_stream_flush('report')
+
+    def schedule_stream_flush(self, what):
+        # Deltas only mark views dirty; the timer repaints at most every STREAM_FLUSH_MS
+        self.stream_dirty.add(what)
+        if not self.stream_timer.isActive():
+            self.stream_timer.start()
+
+    @traced('render')
+    def flush_streams(self):
+        if 'vectors' in self.stream_dirty:
+            self.render_live_vectors()
+        if 'report' in self.stream_dirty:
+            self.render_live_section()
+        self.stream_dirty.clear()
+
+    def set_live_tail(self, view, html):
+        """Replace the streaming tail of a view (from its recorded start to the end) with html."""
+        start = self.live_starts.pop(view, None)
+        if start is not None:
+            cursor = QTextCursor(view.document())
+            cursor.setPosition(start)
+            cursor.movePosition(QTextCursor.End, QTextCursor.KeepAnchor)
+            cursor.removeSelectedText()
+        if html:
+            self.live_starts[view] = self.append_html(view, html)
+
+    def append_html(self, view, html):
+        """Append an HTML fragment as new blocks and return the position it starts at.
+
+        QTextEdit.append/insertHtml merge the fragment's first block into the
+        current one, dropping its heading format, so the block is opened here.
+        """
+        doc = QTextDocument()
+        doc.setDefaultStyleSheet(view.document().defaultStyleSheet())
+        doc.setHtml(html)
+        first = doc.begin()
+        cursor = QTextCursor(view.document())
+        cursor.movePosition(QTextCursor.End)
+        start = cursor.position()
+        if view.document().isEmpty():
+            cursor.setBlockFormat(first.blockFormat())
+        else:
+            cursor.insertBlock(first.blockFormat(), first.charFormat())
+        cursor.insertFragment(QTextDocumentFragment(doc))
+        return start
+
+    def render_live_vectors(self):
+        # Live blocks always sit after the finished ones
+        self.set_live_tail(self.insight_view, "".join(
+            self.vector_block_html(q, t, live=True) for q, t in self.live_vectors.items()
+        ))
+
+    @traced('render')
     def add_analytical_card(self, title, html_content):
-        # Create a container widget for this card/tab
-        card = QWidget()
-        card_layout = QVBoxLayout(card)
-        card_layout.setContentsMargins(20, 20, 20, 20)
-        card_layout.setSpacing(10)
-
-        # Title
-        label = QLabel(title)
-        label.setWordWrap(True)
-        label.setStyleSheet("font-weight: bold; font-size: 16px;")
-        card_layout.addWidget(label)
-
-        # Web content
-        view = QWebEngineView()
-        view.setHtml(html_content)
-        view.setMinimumHeight(500)
-        view.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
-        card_layout.addWidget(view)
-
-        # Button to open in popup
-        popup_btn = QPushButton("Open in Popup")
-        def open_popup():
-            popup = QDialog(self)  # parent is main window
-            popup.setWindowTitle(title)
-            popup.resize(1000, 700)  # large window
-            popup_layout = QVBoxLayout(popup)
-
-            # Add the same web content in popup
-            popup_view = QWebEngineView()
-            popup_view.setHtml(html_content)
-            popup_view.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
-            popup_layout.addWidget(popup_view)
-
-            popup.exec_()  # show modal
-        popup_btn.clicked.connect(open_popup)
-        card_layout.addWidget(popup_btn)
-
-        card_layout.addStretch(1)
-
-        # Add the card as a new tab
-        self.kmap_layout.addTab(card, title)
-    
-    def display_chart(self,name,fig):
-        html = fig.to_html(include_plotlyjs='cdn', full_html=False)
+        # Rendered lazily, in a pooled view, when its tab is first shown
+        self.kmap_layout.add_map(title, html_content)
+
+    @traced('render')
+    def display_chart(self,name,fig_json):
+        self.chart_figures[name] = fig_json
         if name in self.chart_views:
-            self.chart_views[name].setHtml(html)
+            self.chart_views[name].show_figure(fig_json)
+
+    def on_right_tab(self, index):
+        if self.right_tabs.widget(index) is self.charts_tabs and not self.chart_views:
+            self.build_chart_views()
+
+    def build_chart_views(self):
+        from charts import ChartView
+
+        current = self.charts_tabs.currentIndex()
+        for i, c in enumerate(CHART_NAMES):
+            view = ChartView()
+            self.chart_views[c] = view
+            placeholder = self.charts_tabs.widget(i)
+            self.charts_tabs.removeTab(i)
+            placeholder.deleteLater()
+            self.charts_tabs.insertTab(i, view, c)
+            if c in self.chart_figures:
+                view.show_figure(self.chart_figures[c])
+        self.charts_tabs.setCurrentIndex(current)
 
     def add_image(self,title,url):
+        # Download/decode happens on the loader's pool; on_thumb_ready builds the label
+        self.image_loader.request(title, url)
+
+    @traced('render')
+    def on_thumb_ready(self, title, url, img):
         lbl = QLabel(title)
         lbl.setStyleSheet("color:#ffaa00;")
-        pix = QPixmap()
-        try:
-            data = requests.get(url, timeout=5).content
-            pix.loadFromData(data)
-            lbl.setPixmap(pix.scaledToWidth(250,Qt.SmoothTransformation))
-            lbl.mousePressEvent = lambda e, d=data: self.popup_image(d)
-        except: pass
+        lbl.setPixmap(QPixmap.fromImage(img))
+        lbl.mousePressEvent = lambda e, u=url: self.popup_image(u)
         self.image_layout.addWidget(lbl)
-    
-    def popup_image(self, data):
+
+    def popup_image(self, url):
         dlg = QDialog(self)
         dlg.setWindowTitle("Image Viewer")
         v = QVBoxLayout(dlg)
-        lbl = QLabel()
-        pix = QPixmap()
-        pix.loadFromData(data)
-        lbl.setPixmap(pix.scaledToWidth(500, Qt.SmoothTransformation))
+        lbl = QLabel("Loading image...")
         v.addWidget(lbl)
+
+        # Full resolution is only fetched now, off the GUI thread
+        def on_full(u, img):
+            if u != url:
+                return
+            if img.isNull():
+                lbl.setText("Image unavailable.")
+            else:
+                lbl.setPixmap(QPixmap.fromImage(img))
+        self.image_loader.full_ready.connect(on_full)
+        self.image_loader.request_full(url)
         dlg.exec_()
+        self.image_loader.full_ready.disconnect(on_full)
+
+    def write_report(self, path):
+        title = f"DiliGenix Intelligence Report: {self.target}"
+        with open(path,'w',encoding='utf-8') as f:
+            if path.lower().endswith('.html'):
+                f.write(f"<html><head><meta charset='utf-8'><style>{REPORT_CSS}</style></head><body>")
+                f.write(f"<h1>{title}</h1>")
+                f.write("".join(self.section_html.values()))
+                f.write("</body></html>")
+            else:
+                f.write(f"# {title}\n\n")
+                f.write(self.full_report_accumulator)
+
+
+# ---------------------------
+# Job queue
+# ---------------------------
+class Job:
+    """One submitted target: its queue row, workspace and (once started) worker."""
+    def __init__(self, target, run_id, workspace):
+        self.target = target
+        self.run_id = run_id         # stored run to resume/replay, or None
+        self.workspace = workspace
+        self.worker = None
+        self.status = 'queued'       # queued, running, done, failed, cancelled
+        self.item = None             # row in the queue panel
+        self.bar = None              # its progress bar
+
+    @property
+    def active(self):
+        return self.status in ('queued', 'running')
+
+
+# ---------------------------
+# UI: Pegasus Terminal
+# ---------------------------
+class PegasusTerminal(QMainWindow):
+    """Job queue and workspaces. Jobs share the fetcher, caches, LLM scheduler and
+    connection pools; at most max_parallel_jobs run at a time, the rest wait."""
+    def __init__(self):
+        super().__init__()
+        self.setWindowTitle("Pegasus Apex v4 | Market Intelligence Terminal")
+        self.resize(1900, 1000)
+        self.agent_options = {}      # extra ResearchEngine options for new runs
+        self.max_parallel_jobs = MAX_PARALLEL_JOBS
+        self.jobs = []
+        self.live_runs = {}          # run number -> job; signals of other runs are dropped
+        # Shared by every workspace
+        self.image_pool = QThreadPool(self)
+        self.image_pool.setMaxThreadCount(IMAGE_WORKERS)
+        self.view_pool = ViewPool()
+        self.hud_timer = QTimer(self)
+        self.hud_timer.setInterval(HUD_REFRESH_MS)
+        self.hud_timer.timeout.connect(self.update_hud)
+        # Log lines, tree nodes and progress reach the widgets in timed batches
+        self.log_model = LogModel(parent=self)
+        self.bus = EventBus(parent=self)
+        self.bus.subscribe('log', self.append_log_rows)
+        self.bus.subscribe('query', self.add_query_nodes)
+        self.bus.subscribe('url', self.add_url_nodes)
+        self.bus.subscribe('progress', self.set_progress)
+        self.init_ui()
+        self.apply_styles()
+        QTimer.singleShot(PRELOAD_DELAY_MS, preload_modules)
+
+    @property
+    def job(self):
+        """The job whose workspace is shown, or None."""
+        item = self.queue_view.currentItem()
+        return item.data(0, Qt.UserRole) if item else None
+
+    @property
+    def tracer(self):
+        job = self.job
+        return job.workspace.tracer if job else None
+
+    def init_ui(self):
+        central = QWidget()
+        self.setCentralWidget(central)
+        main_layout = QVBoxLayout(central)
+
+        # HUD
+        hud = QFrame()
+        hud.setFixedHeight(40)
+        hud_layout = QHBoxLayout(hud)
+        self.ticker = QLabel("PEGASUS APEX: INTERACTIVE TERMINAL | RECURSIVE AGENT READY")
+        self.ticker.setStyleSheet("color: #ffaa00; font-family: 'Consolas'; font-weight: bold; font-size: 11px;")
+        hud_layout.addWidget(self.ticker)
+        main_layout.addWidget(hud)
+
+        # Command panel
+        cmd_panel = QFrame()
+        cmd_panel.setFixedHeight(60)
+        cmd_layout = QHBoxLayout(cmd_panel)
+        self.input_subject = QLineEdit()
+        self.input_subject.setPlaceholderText("Enter subject for analysis (several: separate with ';')...")
+        self.input_subject.returnPressed.connect(self.start_analysis)
+        self.btn_run = QPushButton("DEPLOY AGENT")
+        self.btn_run.clicked.connect(lambda: self.start_analysis())
+        self.btn_stop = QPushButton("STOP")
+        self.btn_stop.setEnabled(False)
+        self.btn_stop.clicked.connect(self.stop_analysis)
+        self.btn_history = QPushButton("RUN HISTORY")
+        self.btn_history.clicked.connect(self.show_history)
+        self.btn_save = QPushButton("DOWNLOAD REPORT")
+        self.btn_save.setEnabled(False)
+        self.btn_save.clicked.connect(self.save_report)
+        self.btn_trace = QPushButton("EXPORT TRACE")
+        self.btn_trace.setEnabled(False)
+        self.btn_trace.clicked.connect(self.export_trace)
+        cmd_layout.addWidget(self.input_subject)
+        cmd_layout.addWidget(self.btn_run)
+        cmd_layout.addWidget(self.btn_stop)
+        cmd_layout.addWidget(self.btn_history)
+        cmd_layout.addWidget(self.btn_save)
+        cmd_layout.addWidget(self.btn_trace)
+        main_layout.addWidget(cmd_panel)
+
+        splitter = QSplitter(Qt.Horizontal)
+
+        # Left: job queue
+        queue_panel = QWidget()
+        queue_layout = QVBoxLayout(queue_panel)
+        queue_layout.setContentsMargins(0, 0, 0, 0)
+        self.queue_view = QTreeWidget()
+        self.queue_view.setHeaderLabels(["Job", "Status", "Progress"])
+        self.queue_view.setRootIsDecorated(False)
+        self.queue_view.setColumnWidth(0, 150)
+        self.queue_view.setColumnWidth(1, 70)
+        self.queue_view.currentItemChanged.connect(lambda cur, prev: self.on_job_selected())
+        queue_layout.addWidget(self.queue_view)
+        self.btn_remove = QPushButton("REMOVE")
+        self.btn_remove.setEnabled(False)
+        self.btn_remove.clicked.connect(self.remove_job)
+        queue_layout.addWidget(self.btn_remove)
+        splitter.addWidget(queue_panel)
+
+        # Right: the selected job's workspace
+        self.workspaces = QStackedWidget()
+        empty = QLabel("Deploy an agent to open a workspace.")
+        empty.setAlignment(Qt.AlignCenter)
+        self.workspaces.addWidget(empty)
+        splitter.addWidget(self.workspaces)
+
+        splitter.setStretchFactor(0,1)
+        splitter.setStretchFactor(1,6)
+        main_layout.addWidget(splitter)
+
+        # Logs (all jobs)
+        self.log_box = LogView(self.log_model)
+        self.log_box.setFixedHeight(100)
+        main_layout.addWidget(self.log_box)
+
+    def apply_styles(self):
+        self.setStyleSheet("""
+            QWidget { background-color: #0b0e14; color: #d1d5db; font-family: 'Consolas'; }
+            QLineEdit { background:#0b0e14; border:1px solid #30363d; padding:5px; color:white; border-radius:4px; }
+            QPushButton { background:#238636; color:white; font-weight:bold; padding:5px; border-radius:4px; }
+            QPushButton:hover { background:#2ea043; }
+            QPushButton:disabled { background:#1a1f26; color:#444; }
+            QTabWidget::pane { border:1px solid #30363d; }
+            QTreeWidget { background:#0b0e14; border:1px solid #30363d; }
+            QProgressBar { border:1px solid #30363d; background:#000; height:10px; }
+            QProgressBar::chunk { background:#ffaa00; }
+            QTextEdit, QListView { background:#0b0e14; color:#d1d5db; }
+        """)
+
+    # -----------------
+    # Jobs
+    # -----------------
+    def start_analysis(self):
+        """Queue the target(s) typed in the command line, several separated by ';'. Returns the new Jobs."""
+        targets = [t.strip() for t in self.input_subject.text().split(';') if t.strip()]
+        return [self.submit(target) for target in targets]
+
+    def submit(self, target, run_id=None):
+        """Add a job to the queue and show its workspace. Returns the Job."""
+        workspace = Workspace(target, self.image_pool, self.view_pool)
+        job = Job(target, run_id, workspace)
+        self.jobs.append(job)
+        self.workspaces.addWidget(workspace)
+        job.item = QTreeWidgetItem(self.queue_view, [target, job.status])
+        job.item.setData(0, Qt.UserRole, job)
+        job.item.setToolTip(0, target)
+        job.bar = QProgressBar()
+        job.bar.setTextVisible(False)
+        self.queue_view.setItemWidget(job.item, 2, job.bar)
+        self.queue_view.setCurrentItem(job.item)
+        self.start_queued()
+        return job
+
+    def start_queued(self):
+        running = sum(job.status == 'running' for job in self.jobs)
+        for job in self.jobs:
+            if running >= self.max_parallel_jobs:
+                break
+            if job.status == 'queued':
+                self.start_job(job)
+                running += 1
+
+    def start_job(self, job):
+        ws = job.workspace
+        worker = job.worker = RecursiveSectionalAgent(job.target, run_id=job.run_id, **self.agent_options)
+        self.live_runs[worker.run_no] = job
+        ws.tracer = worker.engine.tracer
+        self.connect_run(worker.log_sig, lambda tag, msg: self.log(tag, f"[{job.target}] {msg}"))
+        self.connect_run(worker.query_sig, lambda q: self.bus.post('query', ws, q))
+        self.connect_run(worker.url_sig, lambda q, url: self.bus.post('url', ws, q, url))
+        self.connect_run(worker.vector_intel_sig, ws.stream_vector_insight)
+        self.connect_run(worker.vector_intel_delta_sig, ws.on_vector_delta)
+        self.connect_run(worker.master_section_sig, ws.stream_master_section)
+        self.connect_run(worker.master_section_delta_sig, ws.on_section_delta)
+        self.connect_run(worker.analytical_sig, ws.add_analytical_card)
+        self.connect_run(worker.chart_sig, ws.display_chart)
+        self.connect_run(worker.image_sig, ws.add_image)
+        self.connect_run(worker.progress_sig, lambda v: self.bus.post('progress', job, v))
+        self.connect_run(worker.finished_sig, lambda: self.on_complete(job))
+        # The thread also ends on failure or stop, when finished_sig never fires
+        worker.finished.connect(lambda: self.on_worker_stopped(job))
+        self.set_status(job, 'running')
+        self.hud_timer.start()
+        worker.start()
+
+    def connect_run(self, signal, slot):
+        """Connect a worker signal, dropping emissions of runs whose job was removed."""
+        signal.connect(lambda run, *args: slot(*args) if run in self.live_runs else None)
+
+    def set_status(self, job, status):
+        job.status = status
+        job.item.setText(1, status)
+        if job is self.job:
+            self.update_buttons()
+
+    def stop_analysis(self):
+        """Stop the selected job: cancel it if running, drop it from the queue if waiting."""
+        job = self.job
+        if not job or not job.active:
+            return
+        if job.status == 'queued':
+            self.set_status(job, 'cancelled')
+            return
+        self.btn_stop.setEnabled(False)
+        self.log("SYSTEM", f"[{job.target}] Stopping run...")
+        job.worker.stop()
+
+    def on_complete(self, job):
+        self.log("SUCCESS", f"[{job.target}] Analysis complete.")
+
+    def on_worker_stopped(self, job):
+        self.bus.flush()
+        error = job.worker.engine.error
+        if error is None:
+            self.set_status(job, 'done')
+        else:
+            self.set_status(job, 'cancelled' if isinstance(error, Cancelled) else 'failed')
+        self.start_queued()
+        if not any(j.status == 'running' for j in self.jobs):
+            self.hud_timer.stop()
+        self.update_hud()
+
+    def remove_job(self):
+        """Close the selected finished job and its workspace."""
+        job = self.job
+        if not job or job.active:
+            return
+        self.bus.flush()  # nothing may be left queued for its widgets
+        if job.worker:
+            self.live_runs.pop(job.worker.run_no, None)
+        self.jobs.remove(job)
+        self.queue_view.takeTopLevelItem(self.queue_view.indexOfTopLevelItem(job.item))
+        self.workspaces.removeWidget(job.workspace)
+        job.workspace.release()
+        job.workspace.deleteLater()
+        self.on_job_selected()
+
+    def on_job_selected(self):
+        job = self.job
+        self.workspaces.setCurrentWidget(job.workspace if job else self.workspaces.widget(0))
+        self.update_buttons()
+        self.update_hud()
+
+    def update_buttons(self):
+        job = self.job
+        self.btn_stop.setEnabled(bool(job and job.active))
+        self.btn_remove.setEnabled(bool(job and not job.active))
+        self.btn_save.setEnabled(bool(job and job.status == 'done'))
+        self.btn_trace.setEnabled(bool(job and job.worker and not job.active))
+
+    def update_hud(self):
+        job = self.job
+        if not job:
+            return
+        running = sum(j.status == 'running' for j in self.jobs)
+        queued = sum(j.status == 'queued' for j in self.jobs)
+        summary = job.workspace.tracer.summary_line() if job.workspace.tracer else job.status
+        self.ticker.setText(f"PEGASUS APEX | {running} RUNNING, {queued} QUEUED | {job.target.upper()} | {summary}")
+
+    def closeEvent(self, event):
+        # Don't leave requests running behind a closed window
+        for job in self.jobs:
+            if job.status == 'queued':
+                job.status = 'cancelled'
+        for job in self.jobs:
+            if job.worker and job.worker.isRunning():
+                job.worker.stop()
+                job.worker.wait(5000)
+        super().closeEvent(event)
+
+    def show_history(self):
+        dlg = RunHistoryDialog(self.agent_options.get('run_store') or get_run_store(), self)
+        if dlg.exec_() and dlg.selected:
+            # Finished runs replay from the store; unfinished ones pick up where they stopped
+            self.submit(dlg.selected['target'], run_id=dlg.selected['id'])
+
+    # -----------------
+    # Batched updates (from the event bus)
+    # -----------------
+    @staticmethod
+    def by_owner(batch):
+        """Group (owner, *args) events by owner, keeping order within each."""
+        groups = {}
+        for owner, *args in batch:
+            groups.setdefault(owner, []).append(args)
+        return groups.items()
+
+    def add_query_nodes(self, batch):
+        for ws, rows in self.by_owner(batch):
+            ws.add_query_nodes([q for q, in rows])
+
+    def add_url_nodes(self, batch):
+        for ws, rows in self.by_owner(batch):
+            ws.add_url_nodes(rows)
+
+    def set_progress(self, batch):
+        # Only each job's newest value matters
+        for job, rows in self.by_owner(batch):
+            job.bar.setValue(rows[-1][0])
 
-    def on_complete(self):
-        self.btn_run.setEnabled(True)
-        self.btn_save.setEnabled(True)
-        self.prog.hide()
-        self.log("SUCCESS","Analysis complete.")
+    def log(self,tag,msg):
+        self.bus.post('log', datetime.now().strftime("%H:%M:%S"), tag, msg)
 
+    def append_log_rows(self, batch):
+        # Not traced: the log is shared by all jobs, while tracers are per job
+        self.log_model.append_rows(batch)
+
+    # -----------------
+    # Export
+    # -----------------
     def save_report(self):
-        path,_ = QFileDialog.getSaveFileName(self,"Export Report","Pegasus_Report.md","Markdown (*.md)")
+        job = self.job
+        if not job:
+            return
+        path,_ = QFileDialog.getSaveFileName(self,"Export Report","Pegasus_Report.md","Markdown (*.md);;HTML (*.html)")
         if path:
-            with open(path,'w',encoding='utf-8') as f:
-                f.write(f"# DiliGenix Intelligence Report: {self.input_subject.text()}\n\n")
-                f.write(self.full_report_accumulator)
+            job.workspace.write_report(path)
             QMessageBox.information(self,"Success","Report exported.")
 
-    def log(self,tag,msg):
-        ts = datetime.now().strftime("%H:%M:%S")
-        self.log_box.append(f"<font color='#ffaa00'>[{ts}] <b>{tag}:</b></font> <font color='green'>{msg}</font>")
+    def export_trace(self):
+        path,_ = QFileDialog.getSaveFileName(self,"Export Trace","Pegasus_Trace.json","Chrome trace (*.json)")
+        if path and self.tracer:
+            self.tracer.export(path)
+            QMessageBox.information(self,"Success","Trace exported. Open it in chrome://tracing or ui.perfetto.dev.")
 
 
 # ---------------------------
 # Run Application
 # ---------------------------
 if __name__ == "__main__":
+    # QtWebEngine is imported on first use; its import would otherwise set this,
+    # and it has to be in place before the application object exists.
+    QCoreApplication.setAttribute(Qt.AA_ShareOpenGLContexts)
     app = QApplication(sys.argv)
     terminal = PegasusTerminal()
     terminal.show()
@@ -0,0 +1,98 @@
+import math
+import re
+from collections import Counter
+
+# ---------------------------
+# Local retrieval over gathered intel
+# ---------------------------
+# A small in-memory BM25 index over chunked vector summaries and page text.
+# Section prompts get the chunks most relevant to their own topic, packed to a
+# token budget, instead of one shared character prefix. No network involved.
+
+CHUNK_WORDS = 120
+CHUNK_OVERLAP = 20
+CHARS_PER_TOKEN = 4  # rough estimate, good enough for budgeting prompts
+
+STOPWORDS = frozenset("""
+a an and are as at be by for from has have in is it its of on or that the this to was were will with
+""".split())
+
+_word_re = re.compile(r"[a-z0-9]+(?:[.'][a-z0-9]+)*")
+
+
+def tokenize(text):
+    return [w for w in _word_re.findall(text.lower()) if w not in STOPWORDS]
+
+
+def estimate_tokens(text):
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def chunk_text(text, size=CHUNK_WORDS, overlap=CHUNK_OVERLAP):
+    words = text.split()
+    if len(words) <= size:
+        return [' '.join(words)] if words else []
+    step = size - overlap
+    return [' '.join(words[i:i + size]) for i in range(0, len(words) - overlap, step)]
+
+
+class BM25Index:
+    def __init__(self, k1=1.5, b=0.75):
+        self.k1 = k1
+        self.b = b
+        self.chunks = []  # (source, text)
+        self._tfs = []
+        self._lengths = []
+        self._df = Counter()
+
+    def add(self, source, text):
+        for chunk in chunk_text(text):
+            terms = tokenize(chunk)
+            if not terms:
+                continue
+            tf = Counter(terms)
+            self.chunks.append((source, chunk))
+            self._tfs.append(tf)
+            self._lengths.append(len(terms))
+            self._df.update(tf.keys())
+
+    def __len__(self):
+        return len(self.chunks)
+
+    def search(self, query, k=None):
+        """Return [(score, source, text)] best first."""
+        n = len(self.chunks)
+        if not n:
+            return []
+        avg_len = sum(self._lengths) / n
+        terms = set(tokenize(query))
+        idf = {t: math.log(1 + (n - self._df[t] + 0.5) / (self._df[t] + 0.5)) for t in terms if t in self._df}
+        scored = []
+        for i, tf in enumerate(self._tfs):
+            score = 0.0
+            norm = self.k1 * (1 - self.b + self.b * self._lengths[i] / avg_len)
+            for t, w in idf.items():
+                f = tf.get(t)
+                if f:
+                    score += w * f * (self.k1 + 1) / (f + norm)
+            if score > 0:
+                scored.append((score, i))
+        scored.sort(reverse=True)
+        if k is not None:
+            scored = scored[:k]
+        return [(score, self.chunks[i][0], self.chunks[i][1]) for score, i in scored]
+
+    def pack(self, query, budget_tokens):
+        """Concatenate the most relevant chunks until the token budget is spent."""
+        ranked = [(source, text) for _, source, text in self.search(query)]
+        # A query sharing no terms with the intel still gets something to work from
+        parts = []
+        used = 0
+        for source, text in ranked or self.chunks:
+            block = f"[{source}] {text}"
+            cost = estimate_tokens(block)
+            if used + cost > budget_tokens:
+                continue  # a shorter, lower-ranked chunk may still fit
+            parts.append(block)
+            used += cost
+        return "\n\n".join(parts)
@@ -0,0 +1,129 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+
+from cache import data_dir
+
+# ---------------------------
+# Run store
+# ---------------------------
+# Every step a run completes (query list, each vector's pages/summary/analytical
+# map, each section, chart data) is written to SQLite as it lands. A failed run
+# can be resumed from what was saved, and a finished one replayed without
+# calling the network or the model again.
+
+RUN_STATUSES = ('running', 'failed', 'cancelled', 'done')
+
+
+class RunStore:
+    def __init__(self, path=None):
+        self.path = path or os.path.join(data_dir(), 'runs.db')
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS runs (
+                id TEXT PRIMARY KEY,
+                target TEXT NOT NULL,
+                status TEXT NOT NULL,
+                error TEXT,
+                created REAL NOT NULL,
+                updated REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS steps (
+                run_id TEXT NOT NULL,
+                kind TEXT NOT NULL,
+                key TEXT NOT NULL,
+                data TEXT NOT NULL,
+                created REAL NOT NULL,
+                PRIMARY KEY (run_id, kind, key)
+            );
+            CREATE INDEX IF NOT EXISTS runs_created ON runs(created);
+        """)
+
+    def create_run(self, target):
+        run_id = time.strftime('%Y%m%d-%H%M%S') + '-' + uuid.uuid4().hex[:6]
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO runs (id, target, status, created, updated) VALUES (?, ?, 'running', ?, ?)",
+                (run_id, target, now, now)
+            )
+        return run_id
+
+    def set_status(self, run_id, status, error=None):
+        if status not in RUN_STATUSES:
+            raise ValueError(f"Run status must be one of {RUN_STATUSES}, got {status!r}")
+        with self._lock:
+            self._db.execute(
+                "UPDATE runs SET status = ?, error = ?, updated = ? WHERE id = ?",
+                (status, error, time.time(), run_id)
+            )
+
+    def save(self, run_id, kind, key, data):
+        """Record one completed step; saving the same (kind, key) again replaces it."""
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO steps (run_id, kind, key, data, created) VALUES (?, ?, ?, ?, ?)",
+                (run_id, kind, key, json.dumps(data), now)
+            )
+            self._db.execute("UPDATE runs SET updated = ? WHERE id = ?", (now, run_id))
+
+    def run(self, run_id):
+        """The run's row as a dict, or None."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT id, target, status, error, created, updated FROM runs WHERE id = ?", (run_id,)
+            ).fetchone()
+        return self._row(row) if row else None
+
+    def load(self, run_id):
+        """Saved steps as {kind: {key: data}}."""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT kind, key, data FROM steps WHERE run_id = ? ORDER BY created", (run_id,)
+            ).fetchall()
+        steps = {}
+        for kind, key, data in rows:
+            steps.setdefault(kind, {})[key] = json.loads(data)
+        return steps
+
+    def list_runs(self, limit=50):
+        """Most recent runs first."""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT id, target, status, error, created, updated FROM runs ORDER BY created DESC LIMIT ?",
+                (limit,)
+            ).fetchall()
+        return [self._row(row) for row in rows]
+
+    def delete_run(self, run_id):
+        with self._lock:
+            self._db.execute("DELETE FROM steps WHERE run_id = ?", (run_id,))
+            self._db.execute("DELETE FROM runs WHERE id = ?", (run_id,))
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    @staticmethod
+    def _row(row):
+        return dict(zip(('id', 'target', 'status', 'error', 'created', 'updated'), row))
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_run_store():
+    """Process-wide RunStore at <data_dir>/runs.db, opened on first use."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = RunStore()
+        return _store
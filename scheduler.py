@@ -0,0 +1,285 @@
+import heapq
+import itertools
+import random
+import threading
+import time
+from contextlib import nullcontext
+from dataclasses import dataclass
+
+import httpx
+
+from cancel import Cancelled
+from retrieval import estimate_tokens
+
+# ---------------------------
+# LLM request scheduler
+# ---------------------------
+# Every model call goes through one process-wide scheduler: a priority queue in
+# front of an adaptive concurrency limit (additive increase while latency holds,
+# halved on throttling), with jittered exponential backoff on transient errors.
+# Per-run budgets cap how many requests and tokens a single run may spend, and a
+# run's cancel token pulls its callers out of the queue and out of backoff.
+
+PRIORITY_PLAN = 0      # query generation; the whole run waits on it
+PRIORITY_REPORT = 1    # master sections and chart data
+PRIORITY_INTEL = 2     # vector summaries and condensing
+PRIORITY_OPTIONAL = 3  # analytical-map infographics
+
+RETRY_STATUSES = (408, 429, 500, 502, 503, 504)
+THROTTLE_STATUSES = (429, 503)
+LATENCY_TOLERANCE = 1.5  # recent latency may exceed the long-run average by this factor before backing off
+
+
+class BudgetExceeded(RuntimeError):
+    pass
+
+
+def is_retryable(e):
+    status = getattr(e, 'status_code', None)
+    if isinstance(status, int) and status > 0:
+        return status in RETRY_STATUSES
+    return isinstance(e, (httpx.TransportError, ConnectionError, TimeoutError))
+
+
+def is_throttled(e):
+    return getattr(e, 'status_code', None) in THROTTLE_STATUSES or isinstance(e, httpx.TimeoutException)
+
+
+def response_tokens(resp, messages):
+    """Prompt + completion tokens as reported by the server, else estimated."""
+    get = resp.get if hasattr(resp, 'get') else (lambda k, d=None: d)
+    prompt = get('prompt_eval_count') or estimate_tokens(''.join(m.get('content', '') for m in messages or []))
+    output = get('eval_count') or 0
+    return prompt + output
+
+
+class RunBudget:
+    """Request/token allowance of one run. None means unlimited."""
+
+    def __init__(self, max_requests=None, max_tokens=None):
+        self.max_requests = max_requests
+        self.max_tokens = max_tokens
+        self.requests = 0
+        self.tokens = 0
+        self._lock = threading.Lock()
+
+    def reserve(self):
+        with self._lock:
+            if self.max_requests is not None and self.requests >= self.max_requests:
+                raise BudgetExceeded(f"LLM request budget of {self.max_requests} spent")
+            if self.max_tokens is not None and self.tokens >= self.max_tokens:
+                raise BudgetExceeded(f"LLM token budget of {self.max_tokens} spent")
+            self.requests += 1
+
+    def charge(self, tokens):
+        with self._lock:
+            self.tokens += tokens
+
+
+@dataclass
+class SchedulerStats:
+    requests: int = 0
+    retries: int = 0
+    throttled: int = 0
+    failures: int = 0
+
+
+class LLMScheduler:
+    def __init__(self, initial=4, min_limit=1, max_limit=16, max_retries=4, backoff=1.0, max_backoff=30.0):
+        self.limit = float(initial)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.in_flight = 0
+        self.stats = SchedulerStats()
+        self._latency = {}  # kind -> [recent EWMA, long-run EWMA]
+        self._waiting = []  # heap of (priority, seq)
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+
+    # -----------------
+    # Slots
+    # -----------------
+    def acquire(self, priority, cancel=None):
+        """Block until this caller is the most urgent waiter and a slot is free.
+
+        Raises Cancelled, leaving the queue, if `cancel` is cancelled meanwhile.
+        """
+        with self._cancel_hook(cancel), self._cond:
+            ticket = (priority, next(self._seq))
+            heapq.heappush(self._waiting, ticket)
+            while self._waiting[0] != ticket or self.in_flight >= int(self.limit):
+                if cancel and cancel.cancelled:
+                    self._waiting.remove(ticket)
+                    heapq.heapify(self._waiting)
+                    self._cond.notify_all()  # a cancelled head may have been holding others back
+                    raise Cancelled("Run cancelled")
+                self._cond.wait()
+            heapq.heappop(self._waiting)
+            self.in_flight += 1
+            self.stats.requests += 1
+            self._cond.notify_all()  # the next waiter may fit too
+
+    def release(self):
+        with self._cond:
+            self.in_flight -= 1
+            self._cond.notify_all()
+
+    def _cancel_hook(self, cancel):
+        def wake():
+            with self._cond:
+                self._cond.notify_all()
+        return cancel.hook(wake) if cancel else nullcontext()
+
+    # -----------------
+    # Adaptation
+    # -----------------
+    def on_success(self, kind, latency):
+        with self._cond:
+            ewma = self._latency.setdefault(kind, [latency, latency])
+            ewma[0] += 0.3 * (latency - ewma[0])
+            ewma[1] += 0.05 * (latency - ewma[1])
+            if ewma[0] <= ewma[1] * LATENCY_TOLERANCE:
+                self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+            else:
+                # Latency climbing: the provider is queueing us, ease off gently
+                self.limit = max(self.min_limit, self.limit - 0.5 / self.limit)
+            self._cond.notify_all()
+
+    def on_error(self, e):
+        with self._cond:
+            if is_throttled(e):
+                self.stats.throttled += 1
+                self.limit = max(self.min_limit, self.limit / 2)
+
+    def delay(self, attempt):
+        """Full-jitter exponential backoff."""
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+
+    # -----------------
+    # Calls
+    # -----------------
+    def call(self, fn, priority, budget=None, cancel=None):
+        """Run fn() in a slot, retrying transient failures."""
+        attempt = 0
+        while True:
+            if budget:
+                budget.reserve()
+            self.acquire(priority, cancel)
+            start = time.perf_counter()
+            try:
+                result = fn()
+            except Cancelled:
+                self.release()
+                raise
+            except Exception as e:
+                self.release()
+                if not self._should_retry(e, attempt):
+                    raise
+                attempt += 1
+                self._sleep(self.delay(attempt), cancel)
+                continue
+            self.release()
+            self.on_success('chat', time.perf_counter() - start)
+            return result
+
+    def stream(self, open_stream, priority, budget=None, cancel=None):
+        """Yield from open_stream() while holding a slot.
+
+        A stream that fails before its first chunk is retried; once chunks
+        have been handed out a failure propagates, since they cannot be
+        taken back.
+        """
+        attempt = 0
+        while True:
+            if budget:
+                budget.reserve()
+            self.acquire(priority, cancel)
+            start = time.perf_counter()
+            started = False
+            retry = False
+            try:
+                for chunk in open_stream():
+                    if not started:
+                        started = True
+                        self.on_success('stream', time.perf_counter() - start)
+                    yield chunk
+                return
+            except Cancelled:
+                raise
+            except Exception as e:
+                if started or not self._should_retry(e, attempt):
+                    raise
+                retry = True
+            finally:
+                self.release()
+            if retry:
+                attempt += 1
+                self._sleep(self.delay(attempt), cancel)
+
+    @staticmethod
+    def _sleep(seconds, cancel):
+        if cancel:
+            cancel.sleep(seconds)
+        else:
+            time.sleep(seconds)
+
+    def _should_retry(self, e, attempt):
+        self.on_error(e)
+        if is_retryable(e) and attempt < self.max_retries:
+            with self._cond:
+                self.stats.retries += 1
+            return True
+        with self._cond:
+            self.stats.failures += 1
+        return False
+
+
+class ScheduledClient:
+    """ollama.Client stand-in whose chat() goes through the scheduler.
+
+    Callers pass priority=...; token usage is charged to the run's budget.
+    Cancelling `cancel` abandons queued and backing-off calls.
+    """
+
+    def __init__(self, client, scheduler, budget=None, cancel=None):
+        self.client = client
+        self.scheduler = scheduler
+        self.budget = budget
+        self.cancel = cancel
+
+    def chat(self, model, messages=None, options=None, priority=PRIORITY_INTEL, stream=False, **kwargs):
+        if stream:
+            return self._stream(model, messages, options, priority, kwargs)
+
+        def once():
+            return self.client.chat(model, messages=messages, options=options, **kwargs)
+
+        resp = self.scheduler.call(once, priority, self.budget, self.cancel)
+        if self.budget:
+            self.budget.charge(response_tokens(resp, messages))
+        return resp
+
+    def _stream(self, model, messages, options, priority, kwargs):
+        def open_stream():
+            return self.client.chat(model, messages=messages, options=options, stream=True, **kwargs)
+
+        for chunk in self.scheduler.stream(open_stream, priority, self.budget, self.cancel):
+            if self.budget and chunk.get('done'):
+                self.budget.charge(response_tokens(chunk, messages))
+            yield chunk
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler():
+    """Process-wide scheduler shared by every run, so provider limits are respected together."""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = LLMScheduler()
+        return _scheduler
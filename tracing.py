@@ -0,0 +1,124 @@
+import functools
+import json
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+
+# ---------------------------
+# Per-run tracing
+# ---------------------------
+# Spans (name, category, start, duration, thread, args) are collected in memory
+# for one run. summary() feeds the HUD ticker; chrome_trace() produces a file
+# that chrome://tracing or Perfetto can open.
+
+# Categories in the order the ticker shows them
+CATEGORIES = ('phase', 'search', 'fetch', 'extract', 'llm', 'chart', 'render')
+
+
+@dataclass
+class Span:
+    name: str
+    cat: str
+    start: float  # seconds since the tracer started
+    dur: float
+    tid: int
+    thread: str
+    args: dict = field(default_factory=dict)
+
+
+class Tracer:
+    def __init__(self):
+        self.t0 = time.perf_counter()
+        self.t_end = None  # set by finish() when the run is over
+        self.spans = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def span(self, name, cat, **args):
+        """Time the block. The yielded args dict can be filled in before it ends."""
+        start = time.perf_counter()
+        try:
+            yield args
+        finally:
+            self.add(name, cat, start, time.perf_counter(), **args)
+
+    def finish(self):
+        """Mark the run as over; elapsed stops counting. Later calls are ignored."""
+        if self.t_end is None:
+            self.t_end = time.perf_counter()
+
+    @property
+    def elapsed(self):
+        """Run time so far, or the whole run's once finished."""
+        return (self.t_end or time.perf_counter()) - self.t0
+
+    def add(self, name, cat, start, end, **args):
+        """Record a span from perf_counter() timestamps taken elsewhere."""
+        thread = threading.current_thread()
+        span = Span(name, cat, start - self.t0, end - start, thread.ident, thread.name, args)
+        with self._lock:
+            self.spans.append(span)
+
+    def summary(self):
+        """{category: {'count', 'total', 'max', 'prompt_tokens', 'output_tokens'}}"""
+        with self._lock:
+            spans = list(self.spans)
+        out = {}
+        for s in spans:
+            agg = out.setdefault(s.cat, {'count': 0, 'total': 0.0, 'max': 0.0, 'prompt_tokens': 0, 'output_tokens': 0})
+            agg['count'] += 1
+            agg['total'] += s.dur
+            agg['max'] = max(agg['max'], s.dur)
+            agg['prompt_tokens'] += s.args.get('prompt_tokens', 0)
+            agg['output_tokens'] += s.args.get('output_tokens', 0)
+        return out
+
+    def summary_line(self):
+        """Compact one-line summary for the HUD, e.g. 'search 7×1.2s | llm 23×14.0s 5.1k→6.2k tok'."""
+        summary = self.summary()
+        parts = [f"{self.elapsed:.1f}s"]
+        for cat in CATEGORIES:
+            agg = summary.get(cat)
+            if not agg or cat == 'phase':
+                continue
+            part = f"{cat} {agg['count']}×{agg['total']:.1f}s"
+            if agg['prompt_tokens'] or agg['output_tokens']:
+                part += f" {agg['prompt_tokens'] / 1000:.1f}k→{agg['output_tokens'] / 1000:.1f}k tok"
+            parts.append(part)
+        return " | ".join(parts)
+
+    def chrome_trace(self):
+        """Trace Event Format: complete ('X') events in microseconds plus thread names."""
+        with self._lock:
+            spans = list(self.spans)
+        events = []
+        threads = {}
+        for s in spans:
+            threads[s.tid] = s.thread
+            events.append({
+                'name': s.name, 'cat': s.cat, 'ph': 'X', 'pid': 1, 'tid': s.tid,
+                'ts': round(s.start * 1e6), 'dur': round(s.dur * 1e6), 'args': s.args,
+            })
+        for tid, name in threads.items():
+            events.append({'name': 'thread_name', 'ph': 'M', 'pid': 1, 'tid': tid, 'args': {'name': name}})
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+    def export(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.chrome_trace(), f, default=str)
+        return path
+
+
+def traced(cat):
+    """Method decorator: time the call as a span on self.tracer, if there is one."""
+    def wrap(fn):
+        @functools.wraps(fn)
+        def inner(self, *args, **kwargs):
+            tracer = self.tracer
+            if tracer is None:
+                return fn(self, *args, **kwargs)
+            with tracer.span(fn.__name__, cat):
+                return fn(self, *args, **kwargs)
+        return inner
+    return wrap